@@ -0,0 +1,34 @@
+"""Helpers shared by the benchmark scripts, run them from the repository root."""
+
+from __future__ import annotations
+
+from time import perf_counter
+
+from vstools import core, vs
+
+__all__ = [
+    'pattern_clip', 'fps'
+]
+
+
+def pattern_clip(fmt: int, num_frames: int = 300, width: int = 1920, height: int = 1080) -> vs.VideoNode:
+    """Clip whose pixels vary spatially and temporally, generated with akarin."""
+
+    clip = core.std.BlankClip(None, width, height, fmt, num_frames, keep=True)
+
+    assert clip.format
+
+    peak = 1 if clip.format.sample_type == vs.FLOAT else (1 << clip.format.bits_per_sample) - 1
+
+    return core.akarin.Expr(clip, f'X 7 * Y 13 * + N 3 * + 256 % {peak} * 255 /')
+
+
+def fps(clip: vs.VideoNode) -> float:
+    """Frames per second of a linear render of the whole clip."""
+
+    start = perf_counter()
+
+    for _ in clip.frames(close=True):
+        pass
+
+    return clip.num_frames / (perf_counter() - start)
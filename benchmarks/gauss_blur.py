@@ -0,0 +1,36 @@
+"""
+Every `gauss_blur` strategy available here, timed against the rank `gauss_blur_plans` gives it.
+
+The plans' costs are unitless, this is the measurement to check their order against.
+
+    python benchmarks/gauss_blur.py
+"""
+
+from __future__ import annotations
+
+from _common import fps, pattern_clip
+from vstools import vs
+
+from vsrgtools import gauss_blur, gauss_blur_plans
+
+SIGMAS = (1.0, 2.0, 5.0, 20.0)
+
+
+def main() -> None:
+    print(f'{"format":>12} {"sigma":>5} {"method":>9} {"rank":>4} {"cost":>8} {"error":>7} {"fps":>8}')
+
+    for fmt in (vs.YUV420P8, vs.YUV420PS):
+        clip = pattern_clip(fmt, 100)
+
+        for sigma in SIGMAS:
+            for rank, plan in enumerate(gauss_blur_plans(clip, sigma)):
+                result = fps(gauss_blur(clip, sigma, method=plan.method))
+
+                print(
+                    f'{clip.format.name:>12} {sigma:>5} {plan.method.value:>9} {rank:>4} '
+                    f'{plan.cost:>8.1f} {plan.error:>7.4f} {result:>8.1f}'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmarks of the lut based limit_filter path.
+
+The difference and Lut2 tables are built with NumPy and with the pure Python fallback,
+every difference table being checked against `_limit_filter_value`, the per-value reference.
+The akarin expression, the default, is then timed against the MakeDiff/Lut/MakeDiff chain
+and the single Lut2 of ``fused=True``, both selected with ``LimitFilterMode.CLAMPING(False)``,
+on a 1080p pattern generated with akarin. Tables are built with the nodes, so they're not part of the fps.
+
+    python benchmarks/limit_filter.py
+"""
+
+from __future__ import annotations
+
+from functools import partial
+from itertools import product
+from time import perf_counter
+from typing import Any, Callable, Sequence
+from unittest.mock import patch
+
+from _common import fps, pattern_clip
+from vstools import vs
+
+from vsrgtools import LimitFilterMode, limit, limit_filter
+
+BITS = (8, 10, 12, 16)
+
+# (thr, largen_thr, elast), in 8 bit units like limit_filter's arguments
+PARAMS = ((1, 1, 2.0), (27, 27, 3.3), (39, 27, 2.5), (5, 10, 1.5))
+
+
+def _timed(build: Callable[[], Sequence[int]], cache: Any) -> tuple[float, Sequence[int]]:
+    cache.cache_clear()
+
+    start = perf_counter()
+    table = build()
+
+    return perf_counter() - start, table
+
+
+def _table_args(bits: int, thr: int, largen_thr: int, elast: float) -> tuple[int, int, int, float, int]:
+    peak, neutral = (1 << bits) - 1, 1 << (bits - 1)
+
+    return bits, int(thr * peak / 255), int(largen_thr * peak / 255), elast, neutral
+
+
+def bench_tables() -> None:
+    # NumPy is imported by the first build, keep it out of the timings
+    limit._limit_filter_table(8, 1, 1, 2.0, 128)
+
+    print(f'{"table":>5} {"bits":>4} {"thr":>4} {"lthr":>4} {"elast":>5} {"numpy ms":>9} {"python ms":>9}  exact')
+
+    for name, builder, bits_list in [
+        ('lut', limit._limit_filter_table, BITS), ('lut2', limit._limit_filter_table2, (8, 10))
+    ]:
+        for bits, (thr, largen_thr, elast) in product(bits_list, PARAMS):
+            args = _table_args(bits, thr, largen_thr, elast)
+
+            numpy_time, table = _timed(partial(builder, *args), builder)
+
+            with patch.object(limit, 'find_spec', lambda name: None):
+                python_time, reference = _timed(partial(builder, *args), builder)
+
+            exact = list(table) == list(reference)
+
+            if builder is limit._limit_filter_table:
+                exact = exact and list(table) == [limit._limit_filter_value(x, *args[1:]) for x in range(1 << bits)]
+
+            print(
+                f'{name:>5} {bits:>4} {thr:>4} {largen_thr:>4} {elast:>5} '
+                f'{numpy_time * 1000:>9.2f} {python_time * 1000:>9.2f}  {exact}'
+            )
+
+
+def bench_filter(num_frames: int = 300) -> None:
+    print(f'\n{"format":>12} {"thr":>4} {"lthr":>4} {"elast":>5} {"expr fps":>9} {"chain fps":>9} {"lut2 fps":>9}')
+
+    for fmt in (vs.YUV420P8, vs.YUV420P10):
+        src = pattern_clip(fmt, num_frames)
+        flt = src.std.BoxBlur(hradius=2, vradius=2)
+
+        for thr, largen_thr, elast in PARAMS:
+            kwargs = dict[str, Any](thr=thr, bright_thr=largen_thr, elast=elast)
+
+            expr = fps(limit_filter(flt, src, mode=LimitFilterMode.CLAMPING(True), **kwargs))
+
+            # the enum member keeps the flag, it's restored below
+            try:
+                chain = fps(limit_filter(flt, src, mode=LimitFilterMode.CLAMPING(False), **kwargs))
+                fused = fps(limit_filter(flt, src, mode=LimitFilterMode.CLAMPING(False), fused=True, **kwargs))
+            finally:
+                LimitFilterMode.CLAMPING(True)
+
+            print(
+                f'{src.format.name:>12} {thr:>4} {largen_thr:>4} {elast:>5} '
+                f'{expr:>9.1f} {chain:>9.1f} {fused:>9.1f}'
+            )
+
+
+if __name__ == '__main__':
+    bench_tables()
+    bench_filter()
@@ -0,0 +1,31 @@
+"""
+Square `median_blur` through the akarin selection networks against the ctmf plugin's histogram median.
+
+    python benchmarks/median_blur.py
+"""
+
+from __future__ import annotations
+
+from _common import fps, pattern_clip
+from vstools import vs
+
+from vsrgtools import median_blur
+
+RADII = (2, 3, 4, 6)
+
+
+def main() -> None:
+    print(f'{"format":>12} {"radius":>6} {"expr fps":>8} {"ctmf fps":>8}')
+
+    for fmt in (vs.YUV420P8, vs.YUV420P16):
+        clip = pattern_clip(fmt, 100)
+
+        for radius in RADII:
+            expr = fps(median_blur(clip, radius))
+            ctmf = fps(median_blur(clip, radius, ctmf=True)) if radius >= 3 else float('nan')
+
+            print(f'{clip.format.name:>12} {radius:>6} {expr:>8.1f} {ctmf:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
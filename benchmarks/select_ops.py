@@ -0,0 +1,85 @@
+"""
+RemoveGrain 2-4 and Repair 1-4/11-14 expressions: pruned selection networks against the sortN forms.
+
+Counts the min/max operations of both forms, the sortN ones as the best known full sorting network,
+which is what akarin evaluates before any dead code elimination, then times both through akarin.Expr.
+
+    python benchmarks/select_ops.py
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+from _common import fps, pattern_clip
+from vstools import core, vs
+
+from vsrgtools.aka_expr import aka_removegrain_expr_2_4, aka_repair_expr_1_4, aka_repair_expr_11_14
+from vsrgtools.aka_expr._select import _SORTING_NETWORKS, _batcher_network
+
+RG = 'x[-1,-1] x[0,-1] x[1,-1] x[-1,0] x[1,0] x[-1,1] x[0,1] x[1,1]'
+RP = RG.replace('x', 'y')
+
+
+def _sort_rg(m: int) -> str:
+    return f'{RG} sort8 dup{8 - m} max_val! dup{m - 1} min_val! drop8 x min_val@ max_val@ clamp'
+
+
+def _sort_rp_1_4(m: int) -> str:
+    return f'{RP} y sort9 dup{9 - m} max_val! dup{m - 1} min_val! drop9 x min_val@ max_val@ clamp'
+
+
+def _sort_rp_11_14(m: int) -> str:
+    return f'{RP} sort8 dup{8 - m} max_val! dup{m - 1} min_val! drop8 x y min_val@ min y max_val@ max clamp'
+
+
+# name, first mode, values of m and both forms
+CASES: list[tuple[str, int, range, Callable[[int], str], Callable[[int], str]]] = [
+    ('rg', 0, range(2, 5), aka_removegrain_expr_2_4, _sort_rg),
+    ('rp', 0, range(1, 5), aka_repair_expr_1_4, _sort_rp_1_4),
+    ('rp', 10, range(1, 5), aka_repair_expr_11_14, _sort_rp_11_14)
+]
+
+
+def _min_max(expr: str) -> int:
+    ops = sum(token in {'min', 'max'} for token in expr.split())
+
+    # a full sorting network, two operations per comparator
+    for token in expr.split():
+        if token.startswith('sort'):
+            n = int(token[4:])
+            ops += 2 * len(_SORTING_NETWORKS.get(n, _batcher_network(n)))
+
+    return ops
+
+
+def main() -> None:
+    print(f'{"mode":>6} {"network ops":>11} {"sortN ops":>9}', end='')
+
+    formats = (vs.GRAY8, vs.GRAYS) if hasattr(core, 'akarin') else ()
+
+    for fmt in formats:
+        name = core.get_video_format(fmt).name
+        print(f' {name + " network fps":>18} {name + " sortN fps":>16}', end='')
+
+    print()
+
+    clips = [pattern_clip(fmt, 300) for fmt in formats]
+
+    for name, offset, modes, network, sort in CASES:
+        for m in modes:
+            print(f'{name + str(m + offset):>6} {_min_max(network(m)):>11} {_min_max(sort(m)):>9}', end='')
+
+            for clip in clips:
+                # repair's second clip is a shifted copy, so both clips differ
+                args = [clip] if name == 'rg' else [clip, clip[1:] + clip[-1]]
+
+                network_fps, sort_fps = (fps(core.akarin.Expr(args, expr)) for expr in (network(m), sort(m)))
+
+                print(f' {network_fps:>18.1f} {sort_fps:>16.1f}', end='')
+
+            print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Temporal box blur through std.AverageFrames against the running sum of `temporal_mean_numpy`.
+
+Both are timed on a linear render, with the core's default thread count and with a single thread,
+the only case where every frame reuses the sums of the previous one.
+
+    python benchmarks/temporal_mean.py
+"""
+
+from __future__ import annotations
+
+from _common import fps, pattern_clip
+from vstools import ConvMode, core, vs
+
+from vsrgtools import Backend, box_blur
+
+RADII = (1, 5, 10)
+
+
+def main() -> None:
+    threads = core.num_threads
+
+    print(f'{"format":>12} {"radius":>6} {"threads":>7} {"avgframes fps":>13} {"numpy fps":>9}')
+
+    for fmt in (vs.YUV420P8, vs.YUV420PS):
+        clip = pattern_clip(fmt)
+
+        for radius in RADII:
+            for num_threads in (threads, 1):
+                core.num_threads = num_threads
+
+                matrix = fps(box_blur(clip, radius, mode=ConvMode.TEMPORAL))
+                numpy = fps(box_blur(clip, radius, mode=ConvMode.TEMPORAL, backend=Backend.NUMPY))
+
+                print(f'{clip.format.name:>12} {radius:>6} {num_threads:>7} {matrix:>13.1f} {numpy:>9.1f}')
+
+        core.num_threads = threads
+
+
+if __name__ == '__main__':
+    main()
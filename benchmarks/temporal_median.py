@@ -0,0 +1,32 @@
+"""
+Temporal median through `MeanMode.MEDIAN.temporal`, a selection network in a single expression,
+against the zsmooth plugin's TemporalMedian, the `median_blur` temporal path.
+
+    python benchmarks/temporal_median.py
+"""
+
+from __future__ import annotations
+
+from _common import fps, pattern_clip
+from vstools import core, vs
+
+from vsrgtools import MeanMode
+
+RADII = (1, 2, 3, 5)
+
+
+def main() -> None:
+    print(f'{"format":>12} {"radius":>6} {"expr fps":>8} {"zsmooth fps":>11}')
+
+    for fmt in (vs.YUV420P8, vs.YUV420P16, vs.YUV420PS):
+        clip = pattern_clip(fmt)
+
+        for radius in RADII:
+            expr = fps(MeanMode.MEDIAN.temporal(clip, radius))
+            zsmooth = fps(clip.zsmooth.TemporalMedian(radius)) if hasattr(core, 'zsmooth') else float('nan')
+
+            print(f'{clip.format.name:>12} {radius:>6} {expr:>8.1f} {zsmooth:>11.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+import pytest
+
+if TYPE_CHECKING:
+    from vapoursynth import VideoNode
+
+
+@pytest.fixture
+def noise_clip() -> Callable[..., VideoNode]:
+    """Factory of single frame clips filled with seeded uniform noise over the format's range."""
+
+    vs = pytest.importorskip('vapoursynth')
+    np = pytest.importorskip('numpy')
+
+    def _noise_clip(fmt: int, seed: int, width: int = 64, height: int = 48) -> VideoNode:
+        clip = vs.core.std.BlankClip(None, width, height, fmt, 1, keep=True)
+
+        assert clip.format
+
+        rng = np.random.default_rng(seed)
+
+        noise = [
+            rng.random(shape, np.float32) if clip.format.sample_type == vs.FLOAT
+            else rng.integers(0, 1 << clip.format.bits_per_sample, shape)
+            for shape in [
+                (height, width) if i == 0 or clip.format.color_family != vs.YUV
+                else (height >> clip.format.subsampling_h, width >> clip.format.subsampling_w)
+                for i in range(clip.format.num_planes)
+            ]
+        ]
+
+        def _fill(n: int, f: vs.VideoFrame) -> vs.VideoFrame:
+            fout = f.copy()
+
+            for i, plane in enumerate(noise):
+                np.copyto(np.asarray(fout[i]), plane, 'unsafe')
+
+            return fout
+
+        return clip.std.ModifyFrame(clip, _fill)
+
+    return _noise_clip
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import pytest
+
+vs = pytest.importorskip('vapoursynth')
+np = pytest.importorskip('numpy')
+
+from vsrgtools import median_blur, side_box_blur  # noqa: E402
+
+
+@pytest.mark.parametrize('inverse', [False, True])
+@pytest.mark.parametrize('radius', [1, 2, 3])
+@pytest.mark.parametrize('fmt', [vs.GRAY8, vs.GRAYS])
+def test_side_box_blur_fused(
+    noise_clip: Callable[..., vs.VideoNode], fmt: int, radius: int, inverse: bool
+) -> None:
+    if not hasattr(vs.core, 'akarin'):
+        pytest.skip('akarin is not available')
+
+    clip = noise_clip(fmt, radius)
+
+    fused = side_box_blur(clip, radius, inverse=inverse, fused=True)
+    chain = side_box_blur(clip, radius, inverse=inverse, fused=False)
+
+    assert clip.format
+
+    a, b = (np.asarray(c.get_frame(0)[0], np.float64) for c in (fused, chain))
+
+    # Borders are mirrored by each plugin in its own way, and the final box blur spreads them inwards
+    margin = radius + 1 + (not inverse)
+    a, b = a[margin:-margin, margin:-margin], b[margin:-margin, margin:-margin]
+
+    # The chain rounds every intermediate window mean on integer clips
+    atol = 1e-5 if clip.format.sample_type == vs.FLOAT else 1
+
+    np.testing.assert_allclose(a, b, atol=atol, rtol=0)
+
+
+@pytest.mark.parametrize('radius', [3, 5])
+@pytest.mark.parametrize('fmt', [vs.GRAY8, vs.GRAY16])
+def test_median_blur_ctmf(noise_clip: Callable[..., vs.VideoNode], fmt: int, radius: int) -> None:
+    if not hasattr(vs.core, 'ctmf') or not hasattr(vs.core, 'akarin'):
+        pytest.skip('ctmf or akarin is not available')
+
+    clip = noise_clip(fmt, radius)
+
+    a, b = (
+        np.asarray(median_blur(clip, radius, ctmf=ctmf).get_frame(0)[0])
+        for ctmf in (True, False)
+    )
+
+    # only the interior is compared, the borders are handled by each implementation in its own way
+    np.testing.assert_array_equal(a[radius:-radius, radius:-radius], b[radius:-radius, radius:-radius])
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from math import ceil, floor, sqrt
+from typing import Any
+
+import pytest
+
+vs = pytest.importorskip('vapoursynth')
+np = pytest.importorskip('numpy')
+
+from vstools import ConvMode  # noqa: E402
+
+from vsrgtools import BlurMatrix, GaussBlurMethod, gauss_blur, gauss_blur_plans  # noqa: E402
+from vsrgtools.blur import (  # noqa: E402
+    _box_cascade_error, _box_cascade_radii, _box_cascade_response, _downscale_error
+)
+
+SIGMAS = (1.5, 1.65, 2.3, 4.0, 7.77, 15.2, 40.0)
+
+
+def _kovesi_radii(sigma: float, passes: int = 3) -> list[int]:
+    lower = floor(sqrt(12 * sigma ** 2 / passes + 1))
+    lower -= not lower % 2
+
+    n_lower = round((12 * sigma ** 2 - passes * lower ** 2 - 4 * passes * lower - 3 * passes) / (-4 * lower - 4))
+    n_lower = min(max(n_lower, 0), passes)
+
+    return [(lower - 1) // 2] * n_lower + [(lower + 1) // 2] * (passes - n_lower)
+
+
+def _reference_error(sigma: float, radii: list[int] | tuple[int, ...], axes: int) -> float:
+    box = np.ones(1)
+
+    for radius in radii:
+        box = np.convolve(box, np.full(radius * 2 + 1, 1 / (radius * 2 + 1)))
+
+    half = max(len(box) // 2, ceil(sigma * 4) + 1)
+    box = np.pad(box, half - len(box) // 2)
+
+    gauss = np.exp(-np.arange(-half, half + 1) ** 2 / (2 * sigma ** 2))
+    gauss /= gauss.sum()
+
+    if axes == 2:
+        box, gauss = np.outer(box, box), np.outer(gauss, gauss)
+
+    return float(np.abs(box - gauss).max() / gauss.max())
+
+
+@pytest.mark.parametrize('radii', [(0, ), (1, 1, 2), (3, 4, 4), (12, 13, 13)])
+def test_box_cascade_response(radii: tuple[int, ...]) -> None:
+    response = _box_cascade_response(radii)
+
+    assert len(response) == sum(radii) * 2 + 1
+    assert sum(response) == pytest.approx(1.0)
+    assert response == pytest.approx(response[::-1])
+
+
+@pytest.mark.parametrize('axes', [1, 2])
+@pytest.mark.parametrize('sigma', SIGMAS)
+def test_box_cascade_error(sigma: float, axes: int) -> None:
+    radii = _box_cascade_radii(sigma)
+
+    assert _box_cascade_error(sigma, radii, axes) == pytest.approx(_reference_error(sigma, radii, axes))
+
+    # the chosen radii are never worse than the variance matched ones
+    kovesi = _kovesi_radii(sigma)
+
+    assert _box_cascade_error(sigma, radii) <= _box_cascade_error(sigma, kovesi) + 1e-12
+
+
+@pytest.mark.parametrize(('low', 'high', 'bound'), [(1.5, 3.0, 0.13), (3.0, 6.0, 0.05), (6.0, 40.0, 0.033)])
+def test_box_cascade_error_bounds(low: float, high: float, bound: float) -> None:
+    for sigma in np.arange(low, high, 0.1):
+        assert _box_cascade_error(sigma, _box_cascade_radii(sigma)) < bound
+
+
+def _resize_matrix(src: int, dst: int, kernel: Any, support: float) -> Any:
+    # zimg style resampling weights, the kernel is widened by the ratio when downscaling
+    stretch = min(1.0, dst / src)
+    centers = (np.arange(dst) + 0.5) * src / dst - 0.5
+
+    distance = (np.arange(src)[None, :] - centers[:, None]) * stretch
+    weights = np.where(np.abs(distance) <= support, kernel(distance), 0.0)
+
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize('sigma', (0.5, 1.5, 3.0, 5.0, 7.77))
+def test_downscale_error(sigma: float) -> None:
+    dim, taps = 360, ceil(sigma * 8 + 1) // 2
+    low = round(max(round(dim / sigma), 2) / 2) * 2
+
+    down = _resize_matrix(dim, low, lambda x: np.maximum(1 - np.abs(x), 0.0), 1.0)
+    up = _resize_matrix(low, dim, lambda x: np.exp(-x ** 2 / (2 * 0.8952637851149309 ** 2)), min(taps, 128))
+
+    response = up @ down
+
+    half = ceil(sigma * 4) + 1
+    gauss = np.exp(-np.arange(-half, half + 1) ** 2 / (2 * sigma ** 2))
+    gauss /= gauss.sum()
+
+    # impulses away from the borders, over one period of the low resolution grid
+    errors = [
+        np.abs(response[impulse - half:impulse + half + 1, impulse] - gauss).max() / gauss.max()
+        for impulse in range(dim // 2, dim // 2 + ceil(dim / low))
+    ]
+
+    assert _downscale_error(sigma, dim, taps) == pytest.approx(max(errors))
+
+
+@pytest.mark.parametrize('mode', [ConvMode.HORIZONTAL, ConvMode.HV])
+@pytest.mark.parametrize('sigma', (1.5, 3.0, 6.0))
+@pytest.mark.parametrize('method', [GaussBlurMethod.BOX, GaussBlurMethod.IIR])
+def test_gauss_blur_against_matrix(method: GaussBlurMethod, sigma: float, mode: ConvMode) -> None:
+    clip = vs.core.std.BlankClip(None, 96, 96, vs.GRAYS, 1, keep=True)
+
+    def _impulse(n: int, f: vs.VideoFrame) -> vs.VideoFrame:
+        fout = f.copy()
+        np.asarray(fout[0])[48, 48] = 1.0
+        return fout
+
+    clip = clip.std.ModifyFrame(clip, _impulse)
+
+    plans = {plan.method: plan for plan in gauss_blur_plans(clip, sigma, mode=mode)}
+
+    if method not in plans:
+        pytest.skip(f'{method} is not available')
+
+    out = np.asarray(gauss_blur(clip, sigma, mode=mode, method=method).get_frame(0)[0], np.float64)
+    ref = np.asarray(
+        BlurMatrix.GAUSS(None, sigma=sigma, mode=mode, scale_value=1.0)(clip).get_frame(0)[0], np.float64
+    )
+
+    # the reference is truncated to its taps, and both are computed in single precision
+    tolerance = plans[method].error + plans[GaussBlurMethod.MATRIX].error + 1e-4
+
+    assert np.abs(out - ref).max() <= tolerance * ref.max()
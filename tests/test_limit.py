@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+vs = pytest.importorskip('vapoursynth')
+np = pytest.importorskip('numpy')
+
+from vsrgtools import limit, limit_filter  # noqa: E402
+
+core = vs.core
+
+
+@pytest.mark.parametrize('planes', [[0], [1, 2], [0, 1, 2]])
+def test_limit_filter_expr_planes(monkeypatch: pytest.MonkeyPatch, planes: list[int]) -> None:
+    evaluated = list[list[int]]()
+    norm_expr = limit.norm_expr
+
+    def _norm_expr(clips: list[vs.VideoNode], expr: Any, planes: list[int], **kwargs: Any) -> vs.VideoNode:
+        evaluated.append(planes)
+
+        return norm_expr(clips, expr, planes, **kwargs)
+
+    monkeypatch.setattr(limit, 'norm_expr', _norm_expr)
+
+    # Float clips always take the expression path, and differences this big always return src
+    flt = core.std.BlankClip(None, 16, 16, vs.YUV444PS, 1, color=[0.9, 0.3, 0.3], keep=True)
+    src = core.std.BlankClip(None, 16, 16, vs.YUV444PS, 1, color=[0.1, -0.3, -0.3], keep=True)
+
+    out = limit_filter(flt, src, planes=planes).get_frame(0)
+
+    assert evaluated == [planes]
+
+    for i in range(3):
+        expected = (src if i in planes else flt).get_frame(0)[i]
+
+        np.testing.assert_array_equal(np.asarray(out[i]), np.asarray(expected))
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import pytest
+
+vs = pytest.importorskip('vapoursynth')
+np = pytest.importorskip('numpy')
+
+from vsrgtools import Backend, removegrain, repair  # noqa: E402
+from vsrgtools.rgnumpy import removegrain_numpy, repair_numpy  # noqa: E402
+
+RG_MODES = (*range(1, 25), 26, 27, 28)
+RP_MODES = (*range(1, 25), 26, 27, 28)
+FORMATS = (vs.GRAY8, vs.GRAY16, vs.GRAYS)
+BACKENDS = (Backend.AKARIN, Backend.ZSMOOTH, Backend.RGVS)
+
+
+def _plane(clip: vs.VideoNode) -> np.ndarray:
+    return np.asarray(clip.get_frame(0)[0], np.float64)
+
+
+def _assert_parity(out: vs.VideoNode, ref: vs.VideoNode, backend: Backend) -> None:
+    assert out.format
+
+    a, b = _plane(out), _plane(ref)
+
+    # the plugins leave the one pixel border untouched
+    if backend is not Backend.AKARIN:
+        a, b = a[1:-1, 1:-1], b[1:-1, 1:-1]
+
+    atol = 1e-5 if out.format.sample_type == vs.FLOAT else 1
+
+    np.testing.assert_allclose(a, b, atol=atol, rtol=0)
+
+
+def _run(func, backend: Backend, *args) -> vs.VideoNode:  # type: ignore[no-untyped-def]
+    if not backend.is_available:
+        pytest.skip(f'{backend} is not available')
+
+    try:
+        clip = func(*args, backend=backend)
+        clip.get_frame(0)
+    except (vs.Error, KeyError, ValueError) as e:
+        pytest.skip(f'{backend} doesn\'t support this call: {e}')
+
+    return clip
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('fmt', FORMATS)
+@pytest.mark.parametrize('mode', RG_MODES)
+def test_removegrain_parity(
+    noise_clip: Callable[..., vs.VideoNode], mode: int, fmt: int, backend: Backend
+) -> None:
+    clip = noise_clip(fmt, mode)
+
+    _assert_parity(removegrain_numpy(clip, mode), _run(removegrain, backend, clip, mode), backend)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('fmt', FORMATS)
+@pytest.mark.parametrize('mode', RP_MODES)
+def test_repair_parity(
+    noise_clip: Callable[..., vs.VideoNode], mode: int, fmt: int, backend: Backend
+) -> None:
+    clip, ref = noise_clip(fmt, mode), noise_clip(fmt, mode + 100)
+
+    _assert_parity(repair_numpy(clip, ref, mode), _run(repair, backend, clip, ref, mode), backend)
+
+
+def _kept_rows(out: vs.VideoNode, clip: vs.VideoNode) -> list[int]:
+    # rows left as they were, ignoring the one pixel border
+    a, b = _plane(out)[1:-1, 1:-1], _plane(clip)[1:-1, 1:-1]
+
+    return [y + 1 for y in range(a.shape[0]) if np.array_equal(a[y], b[y])]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('mode', [13, 14, 15, 16])
+def test_removegrain_bob_field(noise_clip: Callable[..., vs.VideoNode], mode: int, backend: Backend) -> None:
+    clip = noise_clip(vs.GRAY8, mode)
+
+    # top field modes interpolate the even rows and keep the odd ones, bottom field modes the other way around
+    kept = list(range(1 if mode in {13, 15} else 2, clip.height - 1, 2))
+
+    assert _kept_rows(removegrain_numpy(clip, mode), clip) == kept
+    assert _kept_rows(_run(removegrain, backend, clip, mode), clip) == kept
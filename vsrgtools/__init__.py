@@ -7,3 +7,4 @@ from .freqs import *
 from .limit import *
 from .rgtools import *
 from .sharp import *
+from .tuner import *
@@ -1,13 +1,20 @@
-from functools import partial
-from typing import Callable
+from functools import lru_cache, partial
+from typing import Callable, NamedTuple
 
+from vstools import vs
+
+from ._clense import *  # noqa: F401, F403
+from ._clense import (  # noqa: F401
+    aka_backward_clense_expr, aka_clense_expr, aka_forward_clense_expr, aka_vertical_cleaner_expr_1,
+    aka_vertical_cleaner_expr_2
+)
 from ._rg import *  # noqa: F401, F403
 from ._rg import (  # noqa: F401
     aka_removegrain_expr_1, aka_removegrain_expr_2_4, aka_removegrain_expr_5, aka_removegrain_expr_6,
     aka_removegrain_expr_7, aka_removegrain_expr_8, aka_removegrain_expr_9, aka_removegrain_expr_10,
-    aka_removegrain_expr_11_12, aka_removegrain_expr_17, aka_removegrain_expr_18, aka_removegrain_expr_19,
-    aka_removegrain_expr_20, aka_removegrain_expr_21_22, aka_removegrain_expr_23, aka_removegrain_expr_24,
-    aka_removegrain_expr_26, aka_removegrain_expr_27, aka_removegrain_expr_28
+    aka_removegrain_expr_11_12, aka_removegrain_expr_13_16, aka_removegrain_expr_17, aka_removegrain_expr_18,
+    aka_removegrain_expr_19, aka_removegrain_expr_20, aka_removegrain_expr_21_22, aka_removegrain_expr_23,
+    aka_removegrain_expr_24, aka_removegrain_expr_26, aka_removegrain_expr_27, aka_removegrain_expr_28
 )
 from ._rp import *  # noqa: F401, F403
 from ._rp import (
@@ -16,6 +23,8 @@ from ._rp import (
     aka_repair_expr_18, aka_repair_expr_19, aka_repair_expr_20, aka_repair_expr_21, aka_repair_expr_22,
     aka_repair_expr_23, aka_repair_expr_24, aka_repair_expr_26, aka_repair_expr_27, aka_repair_expr_28
 )
+from ._select import *  # noqa: F401, F403
+from ._select import aka_select_expr, selection_network  # noqa: F401
 
 
 def _noop_expr() -> str:
@@ -27,7 +36,8 @@ removegrain_aka_exprs = list[Callable[[], str]]([
     partial(aka_removegrain_expr_2_4, 3), partial(aka_removegrain_expr_2_4, 4),
     aka_removegrain_expr_5, aka_removegrain_expr_6, aka_removegrain_expr_7, aka_removegrain_expr_8,
     aka_removegrain_expr_9, aka_removegrain_expr_10, aka_removegrain_expr_11_12, aka_removegrain_expr_11_12,
-    _noop_expr, _noop_expr, _noop_expr, _noop_expr,
+    partial(aka_removegrain_expr_13_16, 13), partial(aka_removegrain_expr_13_16, 14),
+    partial(aka_removegrain_expr_13_16, 15), partial(aka_removegrain_expr_13_16, 16),
     aka_removegrain_expr_17, aka_removegrain_expr_18, aka_removegrain_expr_19, aka_removegrain_expr_20,
     aka_removegrain_expr_21_22, aka_removegrain_expr_21_22, _noop_expr, _noop_expr,
     _noop_expr, aka_removegrain_expr_26, aka_removegrain_expr_27, aka_removegrain_expr_28
@@ -43,3 +53,91 @@ repair_aka_exprs = list[Callable[[], str]]([
     aka_repair_expr_21, aka_repair_expr_22, aka_repair_expr_23, aka_repair_expr_24,
     _noop_expr, aka_repair_expr_26, aka_repair_expr_27, aka_repair_expr_28
 ])
+
+
+class _CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+@lru_cache(maxsize=256)
+def get_removegrain_aka_exprs(mode: tuple[int, ...], sample_type: vs.SampleType, num_planes: int) -> tuple[str, ...]:
+    """
+    Get the per-plane akarin expressions for the specified RemoveGrain modes.
+
+    The result is memoized by modes, sample type and number of planes,
+    so the expression strings are only built once per combination.
+    """
+    expr = list[str]()
+
+    for idx, m in enumerate(mode[:num_planes]):
+        if m in {11, 12}:
+            expr.append(aka_removegrain_expr_11_12())
+        elif m == 23:
+            expr.append(aka_removegrain_expr_23(0 if idx == 0 else -0.5))
+        elif m == 24:
+            expr.append(aka_removegrain_expr_24(0 if idx == 0 else -0.5))
+        else:
+            expr.append(removegrain_aka_exprs[m]())
+
+    return tuple(expr)
+
+
+@lru_cache(maxsize=256)
+def get_repair_aka_exprs(mode: tuple[int, ...], sample_type: vs.SampleType, num_planes: int) -> tuple[str, ...]:
+    """
+    Get the per-plane akarin expressions for the specified Repair modes.
+
+    The result is memoized by modes, sample type and number of planes,
+    so the expression strings are only built once per combination.
+    """
+    return tuple(repair_aka_exprs[m]() for m in mode[:num_planes])
+
+
+@lru_cache(maxsize=256)
+def get_removegrain_repair_aka_exprs(
+    rg_mode: tuple[int, ...], rp_mode: tuple[int, ...], sample_type: vs.SampleType, num_planes: int
+) -> tuple[str, ...]:
+    """
+    Get the per-plane akarin expressions of ``repair(removegrain(clip, rg_mode), clip, rp_mode)``.
+
+    The RemoveGrain result of the center pixel is stored in a variable and used as the Repair clip,
+    while the Repair reference neighbourhood reads directly from the source clip.
+    """
+    expr = list[str]()
+
+    rg_exprs = get_removegrain_aka_exprs(rg_mode, sample_type, num_planes)
+    rp_exprs = get_repair_aka_exprs(rp_mode, sample_type, num_planes)
+
+    for rg, rp in zip(rg_exprs, rp_exprs):
+        if not rp:
+            expr.append(rg)
+            continue
+
+        center = 'RGC@' if rg else 'x'
+
+        rp = ' '.join(
+            center if tok == 'x' else 'x' if tok == 'y' else f'x{tok[1:]}' if tok.startswith('y[') else tok
+            for tok in rp.split()
+        )
+
+        expr.append(f'{rg} RGC! {rp}' if rg else rp)
+
+    return tuple(expr)
+
+
+def aka_expr_cache_info() -> dict[str, _CacheInfo]:
+    """Get the hits/misses counters of the RemoveGrain/Repair expression caches."""
+    return {
+        func.__name__: _CacheInfo(*func.cache_info())
+        for func in (get_removegrain_aka_exprs, get_repair_aka_exprs, get_removegrain_repair_aka_exprs)
+    }
+
+
+def aka_expr_cache_clear() -> None:
+    """Clear the RemoveGrain/Repair expression caches and reset their counters."""
+    get_removegrain_aka_exprs.cache_clear()
+    get_repair_aka_exprs.cache_clear()
+    get_removegrain_repair_aka_exprs.cache_clear()
@@ -0,0 +1,31 @@
+P1 = 'x[0,-1]'
+P2 = 'x[0,-2]'
+N1 = 'x[0,1]'
+N2 = 'x[0,2]'
+
+
+def aka_clense_expr(num_frames: int) -> str:
+    # x: current, y: previous, z: next
+    return f'N 0 = N {num_frames - 1} = or x x y z min y z max clamp ?'
+
+
+def aka_forward_clense_expr(num_frames: int) -> str:
+    # x: current, y: next, z: second next
+    return f'N {num_frames - 3} > x y 2 * z - ref! x y ref@ min y ref@ max clamp ?'
+
+
+def aka_backward_clense_expr() -> str:
+    # x: current, y: previous, z: second previous
+    return 'N 2 < x y 2 * z - ref! x y ref@ min y ref@ max clamp ?'
+
+
+def aka_vertical_cleaner_expr_1() -> str:
+    return f'Y 0 = Y height 1 - = or x x {P1} {N1} min {P1} {N1} max clamp ?'
+
+
+def aka_vertical_cleaner_expr_2() -> str:
+    return (
+        f'Y 2 < Y height 3 - > or x '
+        f'{P1} 2 * {P2} - up! {N1} 2 * {N2} - down! '
+        f'x {P1} {N1} min up@ down@ max min {P1} {N1} max up@ down@ min max clamp ?'
+    )
@@ -1,3 +1,5 @@
+from ._select import aka_select_expr
+
 A1 = 'x[-1,-1]'
 A2 = 'x[0,-1]'
 A3 = 'x[1,-1]'
@@ -15,8 +17,7 @@ def aka_removegrain_expr_1() -> str:
 
 
 def aka_removegrain_expr_2_4(m: int) -> str:
-    # print(f'dup{9 - m} dup{m - 1}')
-    return f'{PIXELS} sort8 dup{8 - m} max_val! dup{m - 1} min_val! drop8 x min_val@ max_val@ clamp'
+    return f'x {aka_select_expr(PIXELS.split(), [m - 1, 8 - m], "rg")} clamp'
 
 
 def aka_removegrain_expr_5() -> str:
@@ -156,6 +157,34 @@ def aka_removegrain_expr_11_12() -> str:
     return f'x 4 * {A2} {A4} {A5} {A7} + + + 2 * + {A1} {A3} {A6} {A8} + + + + 16 /'
 
 
+def aka_removegrain_expr_13_16(m: int) -> str:
+    # Top field modes interpolate the even rows, bottom field modes the odd ones
+    field = 0 if m in {13, 15} else 1
+
+    if m in {13, 14}:
+        interp = (
+            f'mindiff@ d2@ = {A2} {A7} + 2 / '
+            f'mindiff@ d3@ = {A3} {A6} + 2 / '
+            f'{A1} {A8} + 2 / ? ?'
+        )
+    else:
+        interp = (
+            f'{A1} {A2} 2 * + {A3} + {A6} + {A7} 2 * + {A8} + 8 / avg! '
+            f'mindiff@ d2@ = avg@ {A2} {A7} min {A2} {A7} max clamp '
+            f'mindiff@ d3@ = avg@ {A3} {A6} min {A3} {A6} max clamp '
+            f'avg@ {A1} {A8} min {A1} {A8} max clamp ? ?'
+        )
+
+    return (
+        f'Y 2 % {field} = '
+        f'{A1} {A8} - abs d1! '
+        f'{A2} {A7} - abs d2! '
+        f'{A3} {A6} - abs d3! '
+        'd1@ d2@ d3@ min min mindiff! '
+        f'{interp} x ?'
+    )
+
+
 def aka_removegrain_expr_17() -> str:
     return (
         f'{A1} {A8} min mil1! '
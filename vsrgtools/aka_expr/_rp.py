@@ -1,3 +1,5 @@
+from ._select import aka_select_expr
+
 A1 = 'y[-1,-1]'
 A2 = 'y[0,-1]'
 A3 = 'y[1,-1]'
@@ -12,7 +14,7 @@ PIXELS = ' '.join([A1, A2, A3, A4, A5, A6, A7, A8])
 
 
 def aka_repair_expr_1_4(m: int) -> str:
-    return f'{PIXELS} y sort9 dup{9 - m} max_val! dup{m - 1} min_val! drop9 x min_val@ max_val@ clamp'
+    return f'x {aka_select_expr([*PIXELS.split(), c], [m - 1, 9 - m], "rp")} clamp'
 
 
 def aka_repair_expr_5() -> str:
@@ -150,7 +152,10 @@ def aka_repair_expr_10() -> str:
 
 
 def aka_repair_expr_11_14(m: int) -> str:
-    return f'{PIXELS} sort8 dup{8 - m} max_val! dup{m - 1} min_val! drop8 x y min_val@ min y max_val@ max clamp'
+    return (
+        f'{aka_select_expr(PIXELS.split(), [m - 1, 8 - m], "rp")} max_val! min_val! '
+        'x y min_val@ min y max_val@ max clamp'
+    )
 
 
 def aka_repair_expr_15() -> str:
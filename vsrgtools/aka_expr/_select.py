@@ -0,0 +1,146 @@
+from functools import lru_cache
+from typing import Iterable, Sequence
+
+__all__ = [
+    'selection_network', 'aka_select_expr'
+]
+
+# Optimal median networks, N. Devillard, "Fast median search: an ANSI C implementation", 1998.
+# Each (a, b) pair leaves the minimum in a and the maximum in b.
+_MEDIAN_NETWORKS = {
+    9: (
+        (1, 2), (4, 5), (7, 8), (0, 1), (3, 4), (6, 7), (1, 2), (4, 5), (7, 8), (0, 3),
+        (5, 8), (4, 7), (3, 6), (1, 4), (2, 5), (4, 7), (4, 2), (6, 4), (4, 2)
+    ),
+    25: (
+        (0, 1), (3, 4), (2, 4), (2, 3), (6, 7), (5, 7), (5, 6), (9, 10), (8, 10), (8, 9),
+        (12, 13), (11, 13), (11, 12), (15, 16), (14, 16), (14, 15), (18, 19), (17, 19), (17, 18), (21, 22),
+        (20, 22), (20, 21), (23, 24), (2, 5), (3, 6), (0, 6), (0, 3), (4, 7), (1, 7), (1, 4),
+        (11, 14), (8, 14), (8, 11), (12, 15), (9, 15), (9, 12), (13, 16), (10, 16), (10, 13), (20, 23),
+        (17, 23), (17, 20), (21, 24), (18, 24), (18, 21), (19, 22), (8, 17), (9, 18), (0, 18), (0, 9),
+        (10, 19), (1, 19), (1, 10), (11, 20), (2, 20), (2, 11), (12, 21), (3, 21), (3, 12), (13, 22),
+        (4, 22), (4, 13), (14, 23), (5, 23), (5, 14), (15, 24), (6, 24), (6, 15), (7, 16), (7, 19),
+        (13, 21), (15, 23), (7, 13), (7, 15), (1, 9), (3, 11), (5, 17), (11, 17), (9, 17), (4, 10),
+        (6, 12), (7, 14), (4, 6), (4, 7), (12, 14), (10, 14), (6, 7), (10, 12), (6, 10), (6, 17),
+        (12, 17), (7, 17), (7, 10), (12, 18), (7, 12), (10, 18), (12, 20), (10, 20), (10, 12)
+    )
+}
+
+
+# Best known sorting networks, for sizes where Batcher's isn't optimal
+_SORTING_NETWORKS = {
+    9: (
+        (0, 1), (3, 4), (6, 7), (1, 2), (4, 5), (7, 8), (0, 1), (3, 4), (6, 7), (0, 3),
+        (3, 6), (0, 3), (1, 4), (4, 7), (1, 4), (2, 5), (5, 8), (2, 5), (1, 3), (5, 7),
+        (2, 6), (4, 6), (2, 4), (2, 3), (5, 6)
+    )
+}
+
+
+def _batcher_network(n: int) -> list[tuple[int, int]]:
+    # Batcher's odd-even merge sort, comparators touching the padding up to a power of two are dropped
+    size = 1 << max(n - 1, 0).bit_length()
+
+    pairs = list[tuple[int, int]]()
+
+    p = 1
+
+    while p < size:
+        k = p
+
+        while k >= 1:
+            for j in range(k % p, size - k, 2 * k):
+                for i in range(min(k, size - j - k)):
+                    if (i + j) // (2 * p) == (i + j + k) // (2 * p) and i + j + k < n:
+                        pairs.append((i + j, i + j + k))
+
+            k //= 2
+
+        p *= 2
+
+    return pairs
+
+
+def _extrema_network(n: int) -> list[tuple[int, int]]:
+    # Values are compared pairwise, then the minimum is reduced into the first wire and the maximum into the last one
+    pairs = [(i, i + 1) for i in range(0, n - 1, 2)]
+
+    pairs += [(0, i) for i in range(2, n, 2)]
+    pairs += [(i, n - 1) for i in range(1, n - 1, 2)]
+
+    return pairs
+
+
+def _prune(pairs: Iterable[tuple[int, int]], ranks: frozenset[int]) -> list[tuple[int, int, bool, bool]]:
+    needed = set(ranks)
+    network = list[tuple[int, int, bool, bool]]()
+
+    for a, b in reversed(list(pairs)):
+        need_min, need_max = a in needed, b in needed
+
+        if need_min or need_max:
+            network.append((a, b, need_min, need_max))
+            needed |= {a, b}
+
+    return network[::-1]
+
+
+def selection_network(n: int, ranks: Iterable[int]) -> tuple[tuple[int, int, bool, bool], ...]:
+    """
+    Compare-exchange network selecting the specified ranks out of n values, 0 being the smallest.
+
+    Sorting networks are pruned backwards from the requested outputs, so only the comparators
+    they depend on are kept, and each of them only computes the min and/or max that's used afterwards.
+    The network with the fewest min/max operations out of Batcher's, the best known ones
+    and, for medians and extrema, dedicated selection networks is returned.
+
+    :return:        ``(a, b, min, max)`` comparators, a receiving the minimum and b the maximum.
+    """
+    return _selection_network(n, frozenset(ranks))
+
+
+@lru_cache
+def _selection_network(n: int, ranks: frozenset[int]) -> tuple[tuple[int, int, bool, bool], ...]:
+    if any(r not in range(n) for r in ranks):
+        raise ValueError('Ranks must be in the [0, n) range!')
+
+    candidates = [_batcher_network(n)]
+
+    if n in _SORTING_NETWORKS:
+        candidates.append(list(_SORTING_NETWORKS[n]))
+
+    if ranks == {n // 2} and n in _MEDIAN_NETWORKS:
+        candidates.append(list(_MEDIAN_NETWORKS[n]))
+
+    if ranks <= {0, n - 1}:
+        candidates.append(_extrema_network(n))
+
+    networks = [_prune(pairs, ranks) for pairs in candidates]
+
+    return tuple(min(networks, key=lambda network: sum(lo + hi for *_, lo, hi in network)))
+
+
+def aka_select_expr(values: Sequence[str], ranks: Sequence[int], prefix: str = 'sn') -> str:
+    """
+    Expression pushing the values of the specified ranks on the stack, in the order of ``ranks``.
+
+    :param values:      Expressions of the values, evaluated once per use, so better kept to pixel accesses.
+    :param ranks:       Ranks to select, 0 being the smallest.
+    :param prefix:      Prefix of the variables storing the intermediate results.
+    """
+    wires = [str(v) for v in values]
+
+    expr = list[str]()
+
+    for i, (a, b, need_min, need_max) in enumerate(selection_network(len(wires), ranks)):
+        lo, hi = wires[a], wires[b]
+
+        if need_min:
+            expr.append(f'{lo} {hi} min {prefix}{i}l!')
+            wires[a] = f'{prefix}{i}l@'
+
+        if need_max:
+            expr.append(f'{lo} {hi} max {prefix}{i}h!')
+            wires[b] = f'{prefix}{i}h@'
+
+    return ' '.join([*expr, *(wires[r] for r in ranks)])
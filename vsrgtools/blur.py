@@ -1,24 +1,29 @@
 from __future__ import annotations
 
-from functools import partial
-from itertools import count
-from typing import Any, Literal, overload
+from collections import Counter
+from functools import lru_cache, partial
+from importlib.util import find_spec
+from itertools import combinations_with_replacement, count
+from math import ceil, exp, floor, sqrt
+from typing import Any, Literal, NamedTuple, Sequence, overload
 
 from vsexprtools import ExprOp, ExprVars, complexpr_available, norm_expr
 from vskernels import Bilinear, Gaussian
 from vstools import (
-    ConvMode, CustomValueError, FunctionUtil, OneDimConvModeT, PlanesT, SpatialConvModeT,
-    TempConvModeT, check_variable, core, depth, get_depth, join, normalize_planes, normalize_seq, split, to_arr, vs
+    ConvMode, CustomValueError, FunctionUtil, OneDimConvModeT, PlanesT, SpatialConvModeT, TempConvModeT,
+    check_variable, core, depth, get_depth, iterate, join, normalize_planes, normalize_seq, split, to_arr, vs
 )
 
-from .enum import BlurMatrix, BlurMatrixBase, LimitFilterMode
+from .aka_expr import aka_select_expr
+from .enum import BlurMatrix, BlurMatrixBase, GaussBlurMethod, LimitFilterMode
 from .freqs import MeanMode
 from .limit import limit_filter
+from .tuner import Backend, backend_tuner
 from .util import normalize_radius
 
 __all__ = [
     'box_blur', 'side_box_blur',
-    'gauss_blur',
+    'gauss_blur', 'gauss_blur_plans', 'GaussBlurPlan',
     'min_blur', 'sbr', 'median_blur',
     'bilateral', 'flux_smooth'
 ]
@@ -26,19 +31,38 @@ __all__ = [
 
 def box_blur(
     clip: vs.VideoNode, radius: int | list[int] = 1, passes: int = 1,
-    mode: OneDimConvModeT | TempConvModeT = ConvMode.HV, planes: PlanesT = None, **kwargs: Any
+    mode: OneDimConvModeT | TempConvModeT = ConvMode.HV, planes: PlanesT = None,
+    backend: Backend | str | None = None, **kwargs: Any
 ) -> vs.VideoNode:
     assert check_variable(clip, box_blur)
 
     planes = normalize_planes(clip, planes)
 
     if isinstance(radius, list):
-        return normalize_radius(clip, box_blur, radius, planes, passes=passes)
+        return normalize_radius(
+            clip, box_blur, radius, planes, passes=passes, mode=mode, backend=backend, **kwargs
+        )
 
     if not radius:
         return clip
 
-    if mode == ConvMode.TEMPORAL or (clip.format.sample_type == vs.FLOAT and clip.format.bits_per_sample == 16):
+    backend = Backend.from_param(backend, box_blur)
+
+    # Convolution arguments are only understood by BlurMatrix
+    if kwargs:
+        if backend not in {None, Backend.MATRIX}:
+            raise CustomValueError(
+                'Only the matrix backend accepts additional arguments!', box_blur, f'{backend}, {kwargs}'
+            )
+
+        backend = Backend.MATRIX
+
+    if mode == ConvMode.TEMPORAL:
+        if backend is Backend.NUMPY:
+            from .rgnumpy import temporal_mean_numpy
+
+            return iterate(clip, temporal_mean_numpy, passes, radius, planes)
+
         return BlurMatrix.MEAN(radius, mode=mode)(clip, planes, passes=passes, **kwargs)
 
     box_args = (
@@ -47,37 +71,129 @@ def box_blur(
         radius, 0 if mode == ConvMode.HORIZONTAL else passes
     )
 
-    if hasattr(core, 'vszip'):
+    backend = backend or backend_tuner.get(box_blur, backend_tuner.box_blur_mode(ConvMode(mode), radius), clip)
+
+    # vszip blurs half float clips natively, std.BoxBlur needs a single precision round trip
+    if backend is None:
+        backend = Backend.VSZIP if hasattr(core, 'vszip') else Backend.STD
+
+    if backend is Backend.VSZIP:
         return clip.vszip.BoxBlur(*box_args)
 
-    if radius > 12:
+    if backend is Backend.STD:
+        # std.BoxBlur has no half float support, the running sums are done in single precision instead
+        if clip.format.sample_type == vs.FLOAT and clip.format.bits_per_sample == 16:
+            return depth(depth(clip, 32).std.BoxBlur(*box_args), clip)
+
         return clip.std.BoxBlur(*box_args)
 
+    if backend is Backend.NUMPY:
+        from .rgnumpy import box_blur_numpy
+
+        return box_blur_numpy(clip, *box_args)
+
+    if backend is not Backend.MATRIX:
+        raise CustomValueError('Unsupported backend!', box_blur, backend)
+
     return BlurMatrix.MEAN(radius, mode=mode)(clip, planes, passes=passes, **kwargs)
 
 
+@lru_cache
+def _side_box_blur_expr(radius: int, inverse: bool) -> str:
+    # per row of the window: left and right sums without the center column, and the center column itself
+    rows = [
+        (
+            ' '.join(f'x[{dx},{dy}]' for dx in range(-radius, 0)) + ' +' * (radius - 1),
+            f'x[0,{dy}]' if dy else 'x',
+            ' '.join(f'x[{dx},{dy}]' for dx in range(1, radius + 1)) + ' +' * (radius - 1)
+        ) for dy in range(-radius, radius + 1)
+    ]
+
+    def _sum(items: list[str]) -> str:
+        return ' '.join(items) + ' +' * (len(items) - 1)
+
+    # shared partial sums: upper and lower half-windows above/below the center row, and the center row halves
+    expr = [
+        f'{_sum([lt for lt, _, _ in rows[:radius]])} UL!',
+        f'{_sum([ct for _, ct, _ in rows[:radius]])} UC!',
+        f'{_sum([rt for _, _, rt in rows[:radius]])} UR!',
+        f'{_sum([lt for lt, _, _ in rows[radius + 1:]])} DL!',
+        f'{_sum([ct for _, ct, _ in rows[radius + 1:]])} DC!',
+        f'{_sum([rt for _, _, rt in rows[radius + 1:]])} DR!',
+        f'{rows[radius][0]} x + ML!',
+        f'{rows[radius][2]} x + MR!',
+        'UL@ UC@ + UPL!', 'UR@ UC@ + UPR!', 'DL@ DC@ + DNL!', 'DR@ DC@ + DNR!'
+    ]
+
+    half, full = (radius + 1) ** 2, (radius + 1) * (2 * radius + 1)
+
+    # same order as the convolution based implementation, ties keep the last window
+    windows = [
+        f'UPL@ ML@ + {half} /',
+        f'UPR@ MR@ + {half} /',
+        f'UPL@ UR@ + ML@ + MR@ + x - {full} /',
+        f'DNL@ ML@ + {half} /',
+        f'DNR@ MR@ + {half} /',
+        f'DNL@ DR@ + ML@ + MR@ + x - {full} /',
+        f'UPL@ DNL@ + ML@ + {full} /',
+        f'UPR@ DNR@ + MR@ + {full} /'
+    ]
+
+    expr.append(f'{windows[0]} S!')
+
+    for window in windows[1:]:
+        expr.append(f'{window} W! S@ x - abs W@ x - abs < S@ W@ ? S!')
+
+    if inverse:
+        expr.append('S@')
+    else:
+        expr.append(f'x S@ - UPL@ DNL@ + UR@ + DR@ + ML@ + MR@ + x - {(2 * radius + 1) ** 2} / +')
+
+    return ' '.join(expr)
+
+
 def side_box_blur(
     clip: vs.VideoNode, radius: int | list[int] = 1, planes: PlanesT = None,
-    inverse: bool = False
+    inverse: bool = False, fused: bool | None = None
 ) -> vs.VideoNode:
+    """
+    :param clip:            Clip to process.
+    :param radius:          Radius of the side windows.
+    :param planes:          Planes to process.
+    :param inverse:         Return the side window mean closest to each pixel instead of
+                            removing it from the box blurred clip.
+    :param fused:           Evaluate all eight side windows, the selection and the box blur in a single expression,
+                            sharing the partial sums between windows. Defaults to True if akarin is available.
+
+    The full row and full column passes span ``2 * radius + 1`` pixels on both paths.
+    Before the fused path was added, they were 3x3 box blurs whatever the radius,
+    as the radii given to `box_blur` were dropped, so the output differs from older versions.
+
+    :return:                Processed clip.
+    """
     planes = normalize_planes(clip, planes)
 
     if isinstance(radius, list):
-        return normalize_radius(clip, side_box_blur, radius, planes, inverse=inverse)
+        return normalize_radius(clip, side_box_blur, radius, planes, inverse=inverse, fused=fused)
+
+    if fused is None:
+        fused = complexpr_available
+
+    if fused:
+        cum = norm_expr(clip, _side_box_blur_expr(radius, inverse), planes, force_akarin=side_box_blur)
+
+        return cum if inverse else box_blur(cum, 1, min(radius // 2, 1))
 
     half_kernel = [(1 if i <= 0 else 0) for i in range(-radius, radius + 1)]
 
     conv_m1 = partial(core.std.Convolution, matrix=half_kernel, planes=planes)
     conv_m2 = partial(core.std.Convolution, matrix=half_kernel[::-1], planes=planes)
-    blur_pt = partial(box_blur, planes=planes)
+    blur_pt = partial(box_blur, radius=radius, planes=planes)
 
+    # half windows, then the full column/row, the same windows as the fused expression
     vrt_filters, hrz_filters = [
-        [
-            partial(conv_m1, mode=mode), partial(conv_m2, mode=mode),
-            partial(blur_pt, hradius=hr, vradius=vr, hpasses=h, vpasses=v)
-        ] for h, hr, v, vr, mode in [
-            (0, None, 1, radius, ConvMode.VERTICAL), (1, radius, 0, None, ConvMode.HORIZONTAL)
-        ]
+        [partial(conv_m1, mode=mode), partial(conv_m2, mode=mode), partial(blur_pt, mode=mode)]
+        for mode in [ConvMode.VERTICAL, ConvMode.HORIZONTAL]
     ]
 
     vrt_intermediates = (vrt_flt(clip) for vrt_flt in vrt_filters)
@@ -127,17 +243,252 @@ def side_box_blur(
     return cum
 
 
+@lru_cache
+def _box_cascade_radii(sigma: float, passes: int = 3) -> tuple[int, ...]:
+    # Box widths whose cascade has the closest variance to sigma², all within 2 of each other
+    # P. Kovesi, "Fast Almost-Gaussian Filtering", 2010
+    ideal = sqrt(12 * sigma ** 2 / passes + 1)
+
+    lower = floor(ideal)
+    lower -= not lower % 2
+
+    n_lower = round((12 * sigma ** 2 - passes * lower ** 2 - 4 * passes * lower - 3 * passes) / (-4 * lower - 4))
+    n_lower = min(max(n_lower, 0), passes)
+
+    radii = (lower - 1) // 2, (lower + 1) // 2
+
+    if sigma <= 0:
+        return (radii[0], ) * n_lower + (radii[1], ) * (passes - n_lower)
+
+    # Matching the variance doesn't minimise the peak error, so pick the neighbouring radii that do
+    return min(
+        combinations_with_replacement(range(max(radii[0] - 2, 0), radii[1] + 3), passes),
+        key=lambda candidate: _box_cascade_error(sigma, candidate)
+    )
+
+
+def _box_cascade_response(radii: Sequence[int]) -> list[float]:
+    response = [1.0]
+
+    for radius in radii:
+        size = radius * 2 + 1
+        padded = [0.0] * (size - 1) + response + [0.0] * (size - 1)
+
+        running, response = 0.0, []
+
+        for i, value in enumerate(padded):
+            running += value
+
+            if i >= size:
+                running -= padded[i - size]
+
+            if i >= size - 1:
+                response.append(running / size)
+
+    return response
+
+
+def _box_cascade_error(sigma: float, radii: Sequence[int], axes: int = 1) -> float:
+    # Peak error of the cascade's impulse response against the sampled Gaussian, relative to the Gaussian peak
+    box = _box_cascade_response(radii)
+
+    half = max(len(box) // 2, ceil(sigma * 4) + 1)
+    box = [0.0] * (half - len(box) // 2) + box + [0.0] * (half - len(box) // 2)
+
+    gauss = [exp(-(x ** 2) / (2 * sigma ** 2)) for x in range(-half, half + 1)]
+    total = sum(gauss)
+    gauss = [value / total for value in gauss]
+
+    # both responses are symmetric, one quadrant is enough
+    pairs = list(zip(box[half:], gauss[half:]))
+
+    if axes == 1:
+        return max(abs(b - g) for b, g in pairs) / gauss[half]
+
+    return max(abs(bx * by - gx * gy) for bx, gx in pairs for by, gy in pairs) / gauss[half] ** 2
+
+
+@lru_cache
+def _downscale_error(sigma: float, dim: int, taps: int) -> float:
+    # Same measure as the box cascade, for the bilinear resize to dim / sigma followed by the Gaussian resize back.
+    # Both resizes follow zimg: kernels are widened by the ratio when downscaling, the weights are normalized.
+    # The resampling isn't shift invariant, the worst of the impulses at the ceil(ratio) positions following the
+    # center is kept, which samples every phase of the low resolution grid when the ratio is an integer.
+    low = round(max(round(dim / sigma), 2) / 2) * 2
+    ratio = dim / low
+    sigma_low, taps = 0.8952637851149309, min(taps, 128)
+
+    down_stretch, up_stretch = min(1.0, 1 / ratio), min(1.0, ratio)
+    # the Gaussian weights vanish long before the taps
+    down_support, up_support = 1 / down_stretch, min(taps, 8) / up_stretch
+
+    half = ceil(sigma * 4) + 1
+    gauss = [exp(-(x ** 2) / (2 * sigma ** 2)) for x in range(-half, half + 1)]
+    total = sum(gauss)
+    gauss = [value / total for value in gauss]
+
+    def _bilinear(x: float, center: float) -> float:
+        return max(0.0, 1 - abs(x - center) * down_stretch)
+
+    worst = 0.0
+
+    for impulse in range(dim // 2, dim // 2 + ceil(ratio)):
+        first = floor((impulse - down_support + 0.5) / ratio - 0.5)
+        last = ceil((impulse + down_support + 0.5) / ratio - 0.5)
+
+        down = dict[int, float]()
+
+        for k in range(first, last + 1):
+            center = (k + 0.5) * ratio - 0.5
+            span = range(floor(center - down_support), ceil(center + down_support) + 1)
+
+            down[k] = _bilinear(impulse, center) / sum(_bilinear(x, center) for x in span)
+
+        for i, x in enumerate(range(impulse - half, impulse + half + 1)):
+            u = (x + 0.5) / ratio - 0.5
+
+            ks = range(ceil(u - up_support), floor(u + up_support) + 1)
+            weights = [exp(-(((u - k) * up_stretch) ** 2) / (2 * sigma_low ** 2)) for k in ks]
+
+            response = sum(w * down.get(k, 0.0) for w, k in zip(weights, ks)) / sum(weights)
+
+            worst = max(worst, abs(response - gauss[i]))
+
+    return worst / gauss[half]
+
+
+class GaussBlurPlan(NamedTuple):
+    """Cost estimate of a `gauss_blur` strategy, see `gauss_blur_plans`."""
+
+    method: GaussBlurMethod
+    """Strategy."""
+
+    cost: float
+    """Relative cost, only meaningful to rank the plans of a same call against each other, not a timing."""
+
+    error: float
+    """Peak error of the impulse response against the exact Gaussian, relative to the kernel peak."""
+
+
+def gauss_blur_plans(
+    clip: vs.VideoNode, sigma: float = 0.5, taps: int | None = None, mode: ConvMode = ConvMode.HV
+) -> list[GaussBlurPlan]:
+    """
+    Estimate the cost and accuracy of every `gauss_blur` strategy available for this clip.
+
+    This is what the ``auto`` method picks from, and can be printed to see why a strategy was chosen.
+    The costs are unitless ranks: the plugin based strategies get unmeasured per-tap and per-pass estimates,
+    the NumPy one is derived from single thread timings and multiplied by the number of threads,
+    as its frames can't be processed in parallel. How it ranks against the plugins is only indicative,
+    ``benchmarks/gauss_blur.py`` times every available strategy on the current machine.
+
+    The errors are computed from the impulse responses, for the downscale one at the clip's dimensions.
+
+    :param clip:            Clip to blur.
+    :param sigma:           Standard deviation of the Gaussian.
+    :param taps:            Kernel taps, defaults to ``ceil(sigma * 8 + 1) // 2``.
+    :param mode:            Convolution mode.
+
+    :return:                Available strategies, cheapest first.
+    """
+    assert check_variable(clip, gauss_blur_plans)
+
+    taps = BlurMatrix.GAUSS.get_taps(sigma, taps)
+    size = taps * 2 + 1
+    axes = 2 if mode in {ConvMode.HV, ConvMode.SQUARE} else 1
+    fp16 = clip.format.sample_type == vs.FLOAT and clip.format.bits_per_sample == 16
+
+    # tail of the Gaussian cut by the kernel size
+    truncation = exp(-((taps + 1) ** 2) / (2 * sigma ** 2)) if sigma > 0 else 0.0
+
+    plans = list[GaussBlurPlan]()
+
+    if mode.is_temporal:
+        cost = 0.15 * size if size <= 31 and not fp16 else 0.4 * size
+    elif mode == ConvMode.SQUARE:
+        cost = 0.4 * size ** 2
+    else:
+        cost = (0.12 if size <= 25 and not fp16 else 0.4) * size * axes
+
+    plans.append(GaussBlurPlan(GaussBlurMethod.MATRIX, cost, truncation))
+
+    if not mode.is_temporal:
+        # three running sum passes per axis, with a float32 round trip for half float without vszip
+        cost = 3.0 * axes + (2.0 if fp16 and not hasattr(core, 'vszip') else 0.0)
+
+        error = _box_cascade_error(sigma, _box_cascade_radii(sigma), axes) if sigma > 0 else 0.0
+
+        plans.append(GaussBlurPlan(GaussBlurMethod.BOX, cost, error))
+
+        if hasattr(core, 'resize2'):
+            plans.append(GaussBlurPlan(GaussBlurMethod.RESIZE2, 0.25 * size * axes, truncation))
+
+            # bilinear downscale by sigma, then a small Gaussian and the upscale
+            errors = [
+                _downscale_error(sigma, dim, taps) if sigma > 0 else 0.0
+                for dim, axis in [(clip.width, ConvMode.HORIZONTAL), (clip.height, ConvMode.VERTICAL)]
+                if axis in mode
+            ]
+
+            # both resizes are separable, |x * y - gx * gy| stays under ex + ey + ex * ey of the 2D peak
+            error = errors[0] if len(errors) == 1 else errors[0] + errors[1] + errors[0] * errors[1]
+
+            plans.append(GaussBlurPlan(GaussBlurMethod.DOWNSCALE, (0.5 * sigma + 3.0) * axes, error))
+
+        if Backend.NUMPY.is_available:
+            # single thread timings in nanoseconds per pixel, from 540p to 2160p, with both sigmas at 2
+            if find_spec('scipy'):
+                cost = 25.0 * axes
+            else:
+                # the Python loop runs once per column or row, so its overhead is spread over the other dimension
+                dims = [clip.height] * (mode != ConvMode.VERTICAL) + [clip.width] * (mode != ConvMode.HORIZONTAL)
+
+                cost = sum(40.0 + 36000.0 / dim for dim in dims if dim)
+
+            # the ModifyFrame callback holds the GIL, so frames are processed one at a time
+            # while the plugin based strategies run on every thread
+            cost = (cost + 2.0) * core.num_threads
+
+            # Deriche's approximation stays under 5e-4 per axis, see gauss_blur_iir_array, and the 2D one is the product
+            error = 5e-4 if axes == 1 else 2 * 5e-4 + 5e-4 ** 2
+
+            plans.append(GaussBlurPlan(GaussBlurMethod.IIR, cost, error))
+
+    return sorted(plans, key=lambda plan: plan.cost)
+
+
 def gauss_blur(
     clip: vs.VideoNode, sigma: float | list[float] = 0.5, taps: int | None = None,
-    mode: ConvMode = ConvMode.HV, planes: PlanesT = None,
-    **kwargs: Any
+    mode: ConvMode = ConvMode.HV, planes: PlanesT = None, method: GaussBlurMethod | str | None = None,
+    tolerance: float = 0.01, **kwargs: Any
 ) -> vs.VideoNode:
+    """
+    :param clip:            Clip to process.
+    :param sigma:           Standard deviation of the Gaussian.
+    :param taps:            Kernel taps, defaults to ``ceil(sigma * 8 + 1) // 2``.
+    :param mode:            Convolution mode.
+    :param planes:          Planes to process.
+    :param method:          Strategy used to blur, see `GaussBlurMethod`.
+                            Defaults to resize2 if available for spatial blurs, else BlurMatrix.GAUSS.
+    :param tolerance:       Highest peak error the ``auto`` method accepts, relative to the kernel peak.
+                            See `gauss_blur_plans` for the estimates it chooses from.
+
+    The ``box`` method runs three box blurs, with the radii near sigma's variance that minimise the peak error
+    of the impulse response against the exact sampled kernel. Relative to the kernel peak, that error stays
+    under 13% per axis for ``1.5 <= sigma < 3``, 5% up to 6 and 3.3% up to 40, and roughly doubles for
+    the 2D kernel. `gauss_blur_plans` reports the exact figure for a given sigma.
+    Smaller sigmas can't be matched by integer radii and are better served by the other methods.
+
+    :return:                Blurred clip.
+    """
     assert check_variable(clip, gauss_blur)
 
     planes = normalize_planes(clip, planes)
 
     if isinstance(sigma, list):
-        return normalize_radius(clip, gauss_blur, ('sigma', sigma), planes, mode=mode)
+        return normalize_radius(
+            clip, gauss_blur, ('sigma', sigma), planes, mode=mode, method=method, tolerance=tolerance, **kwargs
+        )
 
     if ConvMode.VERTICAL in mode:
         sigma = min(sigma, clip.height)
@@ -147,13 +498,51 @@ def gauss_blur(
 
     taps = BlurMatrix.GAUSS.get_taps(sigma, taps)
 
-    if hasattr(core, 'resize2') and not mode.is_temporal:
+    # Downscale approximation used to be requested by specifying _fast=True
+    if kwargs.pop('_fast', False) and method is None:
+        method = GaussBlurMethod.DOWNSCALE
+
+    method = GaussBlurMethod.from_param(method, gauss_blur)
+
+    if method is None:
+        if hasattr(core, 'resize2') and not mode.is_temporal:
+            method = GaussBlurMethod.RESIZE2
+        else:
+            method = GaussBlurMethod.MATRIX
+    elif method is GaussBlurMethod.AUTO:
+        plans = gauss_blur_plans(clip, sigma, taps, mode)
+
+        method = next(
+            (plan.method for plan in plans if plan.error <= tolerance), min(plans, key=lambda plan: plan.error).method
+        )
+
+    if method is not GaussBlurMethod.MATRIX and mode.is_temporal:
+        raise CustomValueError('Only the matrix method supports temporal blurs!', gauss_blur, method)
+
+    if method is GaussBlurMethod.BOX:
+        box_mode = ConvMode.HV if mode == ConvMode.SQUARE else mode
+
+        for radius, passes in Counter(_box_cascade_radii(sigma)).items():
+            clip = box_blur(clip, radius, passes, box_mode, planes)
+
+        return clip
+
+    if method is GaussBlurMethod.IIR:
+        from .rgnumpy import gauss_blur_iir_numpy
+
+        return gauss_blur_iir_numpy(
+            clip,
+            sigma if ConvMode.HORIZONTAL in mode or mode == ConvMode.SQUARE else 0.0,
+            sigma if ConvMode.VERTICAL in mode or mode == ConvMode.SQUARE else 0.0,
+            planes
+        )
+
+    if method in {GaussBlurMethod.RESIZE2, GaussBlurMethod.DOWNSCALE}:
         def _resize2_blur(plane: vs.VideoNode, sigma: float, taps: int) -> vs.VideoNode:
             resize_kwargs = dict[str, Any]()
 
-            # Downscale approximation can be used by specifying _fast=True
-            # Has a big speed gain when taps is large
-            if kwargs.pop("_fast", False):
+            # Downscale approximation, has a big speed gain when taps is large
+            if method is GaussBlurMethod.DOWNSCALE:
                 wdown, hdown = plane.width, plane.height
 
                 if ConvMode.VERTICAL in mode:
@@ -187,6 +576,34 @@ def gauss_blur(
     return kernel(clip, planes, **kwargs)
 
 
+@lru_cache
+def _min_blur_expr(radius: int, mode_blur: ConvMode, mode_median: ConvMode) -> str:
+    weights = BlurMatrix.BINOMIAL(radius)
+
+    if mode_blur in {ConvMode.HV, ConvMode.SQUARE}:
+        coordinates = [(x, y) for y in range(-radius, radius + 1) for x in range(-radius, radius + 1)]
+    elif mode_blur == ConvMode.VERTICAL:
+        coordinates = [(0, y) for y in range(-radius, radius + 1)]
+    else:
+        coordinates = [(x, 0) for x in range(-radius, radius + 1)]
+
+    terms = list[str]()
+
+    for x, y in coordinates:
+        weight = (1 if mode_blur == ConvMode.VERTICAL else weights[x + radius]) * (
+            1 if mode_blur == ConvMode.HORIZONTAL else weights[y + radius]
+        )
+
+        terms.append((f'x[{x},{y}]' if x or y else 'x') + (f' {weight} *' if weight != 1 else ''))
+
+    total = sum(weights) ** (2 if mode_blur in {ConvMode.HV, ConvMode.SQUARE} else 1)
+
+    blur = ' '.join(terms) + ' +' * (len(terms) - 1) + f' {total} /'
+    median = _median_expr(ExprOp.matrix('x', radius, mode_median)[0])
+
+    return f'{blur} BLUR! {median} MED! x BLUR@ MED@ min BLUR@ MED@ max clip'
+
+
 def min_blur(
     clip: vs.VideoNode, radius: int | list[int] = 1,
     mode: tuple[ConvMode, ConvMode] = (ConvMode.HV, ConvMode.SQUARE), planes: PlanesT = None,
@@ -195,6 +612,9 @@ def min_blur(
     """
     MinBlur by Didée (http://avisynth.nl/index.php/MinBlur)
     Nifty Gauss/Median combination
+
+    For radius 1 and 2 with akarin, the binomial blur, the median and the final
+    3-way median are evaluated in a single expression.
     """
     assert check_variable(clip, min_blur)
 
@@ -205,7 +625,14 @@ def min_blur(
     
     mode_blur, mode_median = normalize_seq(mode, 2)
 
-    blurred = BlurMatrix.BINOMIAL(radius=radius, mode=mode_blur)(clip, planes=planes, **kwargs)
+    if all([
+        complexpr_available, radius in {1, 2}, not kwargs,
+        mode_blur in {ConvMode.HORIZONTAL, ConvMode.VERTICAL, ConvMode.HV, ConvMode.SQUARE},
+        mode_median in {ConvMode.HORIZONTAL, ConvMode.VERTICAL, ConvMode.SQUARE}
+    ]):
+        return norm_expr(clip, _min_blur_expr(radius, mode_blur, mode_median), planes, force_akarin=min_blur)
+
+    blurred = BlurMatrix.BINOMIAL(radius, mode=mode_blur)(clip, planes=planes, **kwargs)
     median = median_blur(clip, radius, mode_median, planes=planes)
 
     return MeanMode.MEDIAN([clip, blurred, median], planes=planes)
@@ -234,6 +661,10 @@ def sbr(
     )
 
 
+def _median_expr(window: Sequence[str]) -> str:
+    return aka_select_expr(window, [len(window) // 2])
+
+
 @overload
 def median_blur(
     clip: vs.VideoNode, radius: int = ..., mode: Literal[ConvMode.TEMPORAL] = ..., planes: PlanesT = ...
@@ -243,44 +674,61 @@ def median_blur(
 
 @overload
 def median_blur(
-    clip: vs.VideoNode, radius: int | list[int] = ..., mode: SpatialConvModeT = ..., planes: PlanesT = None
+    clip: vs.VideoNode, radius: int | list[int] = ..., mode: SpatialConvModeT = ..., planes: PlanesT = None,
+    ctmf: bool = ...
 ) -> vs.VideoNode:
     ...
 
 
 @overload
 def median_blur(
-    clip: vs.VideoNode, radius: int | list[int] = ..., mode: ConvMode = ..., planes: PlanesT = None
+    clip: vs.VideoNode, radius: int | list[int] = ..., mode: ConvMode = ..., planes: PlanesT = None,
+    ctmf: bool = ...
 ) -> vs.VideoNode:
     ...
 
 
 def median_blur(
-    clip: vs.VideoNode, radius: int | list[int] = 1, mode: ConvMode = ConvMode.SQUARE, planes: PlanesT = None
+    clip: vs.VideoNode, radius: int | list[int] = 1, mode: ConvMode = ConvMode.SQUARE, planes: PlanesT = None,
+    ctmf: bool = False
 ) -> vs.VideoNode:
+    """
+    :param clip:            Clip to process.
+    :param radius:          Radius of the median window, per plane.
+    :param mode:            Window shape, or temporal median through zsmooth.
+    :param planes:          Planes to process.
+    :param ctmf:            Use the constant time histogram median of the ctmf plugin for integer clips
+                            with a single square radius of 3 or more. Its cost doesn't grow with the radius,
+                            see ``benchmarks/median_blur.py``, but its borders aren't guaranteed to match.
+
+    :return:                Processed clip.
+    """
     if mode == ConvMode.TEMPORAL:
         if isinstance(radius, int):
             return clip.zsmooth.TemporalMedian(radius, planes)
 
         raise CustomValueError("A list of radius isn't supported for ConvMode.TEMPORAL!", median_blur, radius)
 
+    assert check_variable(clip, median_blur)
+
     radius = to_arr(radius)
 
-    if (len((rs := set(radius))) == 1 and rs.pop() == 1) and mode == ConvMode.SQUARE:
-        return clip.std.Median(planes=planes)
+    if len(rs := set(radius)) == 1 and mode == ConvMode.SQUARE:
+        r = rs.pop()
+
+        if r == 1:
+            return clip.std.Median(planes=planes)
+
+        if ctmf and r >= 3 and clip.format.sample_type == vs.INTEGER:
+            return clip.ctmf.CTMF(r, planes=planes)
 
     expr_plane = list[list[str]]()
 
     for r in radius:
         expr_passes = list[str]()
 
-        for mat in ExprOp.matrix('x', r, mode, [(0, 0)]):
-            rb = len(mat) + 1
-            st = rb - 1
-            sp = rb // 2 - 1
-            dp = st - 2
-
-            expr_passes.append(f"{mat} sort{st} swap{sp} min! swap{sp} max! drop{dp} x min@ max@ clip")
+        for mat in ExprOp.matrix('x', r, mode):
+            expr_passes.append(_median_expr(mat))
 
         expr_plane.append(expr_passes)
 
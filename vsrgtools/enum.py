@@ -1,15 +1,13 @@
 from __future__ import annotations
 
-import operator
-
 from enum import auto
-from itertools import accumulate
-from math import ceil, exp, log2, pi, sqrt
+from functools import lru_cache
+from math import ceil, exp, gcd, isqrt, log2, pi, sqrt
 from typing import Any, Iterable, Literal, Self, Sequence, overload
 
 from vsexprtools import ExprList, ExprOp, ExprToken, ExprVars
 from vstools import (
-    ConvMode, CustomIntEnum, CustomValueError, KwargsT, Nb, PlanesT, check_variable, core, fallback,
+    ConvMode, CustomIntEnum, CustomStrEnum, CustomValueError, KwargsT, Nb, PlanesT, check_variable, core, fallback,
     iterate, shift_clip_multi, to_singleton, vs
 )
 
@@ -18,6 +16,7 @@ __all__ = [
     'RemoveGrainMode', 'RemoveGrainModeT',
     'RepairMode', 'RepairModeT',
     'VerticalCleanerMode', 'VerticalCleanerModeT',
+    'GaussBlurMethod',
     'BlurMatrixBase', 'BlurMatrix'
 ]
 
@@ -140,23 +139,99 @@ class VerticalCleanerMode(CustomIntEnum):
 VerticalCleanerModeT = int | VerticalCleanerMode | Sequence[int | VerticalCleanerMode]
 
 
+class GaussBlurMethod(CustomStrEnum):
+    """Strategies `gauss_blur` can use."""
+
+    RESIZE2 = 'resize2'
+    """Gaussian resampling through the resize2 plugin."""
+
+    MATRIX = 'matrix'
+    """BlurMatrix.GAUSS convolution, cost grows with the number of taps."""
+
+    DOWNSCALE = 'downscale'
+    """Bilinear downscale by sigma, small resize2 Gaussian and upscale back. Fast but approximate."""
+
+    BOX = 'box'
+    """Cascade of three box blurs, cost is constant in sigma. Approximate, see `gauss_blur`."""
+
+    IIR = 'iir'
+    """Deriche recursive filter through the NumPy engine, cost is constant in sigma."""
+
+    AUTO = 'auto'
+    """Cheapest available strategy within the requested tolerance, see `gauss_blur_plans`."""
+
+
 class BlurMatrixBase(list[Nb]):
     def __init__(
         self, __iterable: Iterable[Nb], /, mode: ConvMode = ConvMode.SQUARE,
     ) -> None:
         self.mode = mode
+        self._factors: tuple[list[Nb], list[Nb]] | None = None
         super().__init__(__iterable)  # type: ignore[arg-type]
 
+    @property
+    def factors(self) -> tuple[list[Nb], list[Nb]] | None:
+        """
+        Horizontal and vertical 1D kernels whose outer product is this SQUARE kernel, if it's separable.
+
+        Kernels built with `outer` keep their factor, others are checked for being rank 1.
+        Integer kernels get integer factors, whose product is the kernel up to a positive constant.
+        """
+        if self.mode != ConvMode.SQUARE:
+            return None
+
+        if self._factors is not None:
+            return self._factors
+
+        size = isqrt(len(self))
+
+        if size < 2 or size * size != len(self):
+            return None
+
+        rows = [self[i * size:(i + 1) * size] for i in range(size)]
+
+        prow, pcol = max(
+            ((i, j) for i in range(size) for j in range(size)), key=lambda ij: abs(rows[ij[0]][ij[1]])
+        )
+
+        if not (pivot := rows[prow][pcol]):
+            return None
+
+        horizontal, vertical = rows[prow], [row[pcol] for row in rows]
+
+        tolerance = 1e-9 * abs(pivot) ** 2
+
+        if any(
+            abs(rows[i][j] * pivot - vertical[i] * horizontal[j]) > tolerance
+            for i in range(size) for j in range(size)
+        ):
+            return None
+
+        if all(float(w).is_integer() for w in self):
+            # Dividing the column by the pivot would give fractional weights, rounded by std.Convolution
+            sign = 1 if pivot > 0 else -1
+            hdiv, vdiv = gcd(*map(int, horizontal)), gcd(*map(int, vertical))
+
+            self._factors = ([sign * int(h) // hdiv for h in horizontal], [int(v) // vdiv for v in vertical])
+        else:
+            self._factors = (horizontal, [v / pivot for v in vertical])  # type: ignore[misc]
+
+        return self._factors
+
     def __call__(
         self, clip: vs.VideoNode, planes: PlanesT = None,
         bias: float | None = None, divisor: float | None = None, saturate: bool = True,
-        passes: int = 1, expr_kwargs: KwargsT | None = None, **conv_kwargs: Any
+        passes: int = 1, expr_kwargs: KwargsT | None = None, compose: bool = False, **conv_kwargs: Any
     ) -> vs.VideoNode:
         """
         Performs a spatial or temporal convolution.
         It will either calls std.Convolution, std.AverageFrames or ExprOp.convolution
         based on the ConvMode mode picked.
 
+        Separable SQUARE kernels are run as a horizontal and a vertical pass.
+        On integer clips the intermediate pass is rounded to the clip's format,
+        so the output can differ by one from the 2D convolution.
+
         :param clip:            Clip to process.
         :param planes:          Specifies which planes will be processed.
         :param bias:            Value to add to the final result of the convolution
@@ -167,6 +242,9 @@ class BlurMatrixBase(list[Nb]):
                                 If False, absolute values are returned.
         :param passes:          Number of iterations.
         :param expr_kwargs:     A KwargsT of keyword arguments for ExprOp.convolution.__call__ when it is picked.
+        :param compose:         Run the kernel convolved `passes` times with itself in a single pass,
+                                when it still fits std.Convolution or std.AverageFrames.
+                                Only the borders and rounding differ from iterating the convolution.
         :param **conv_kwargs:   Additional keyword arguments for std.Convolution, std.AverageFrames or ExprOp.convolution.
 
         :return:                Processed clip.
@@ -180,9 +258,40 @@ class BlurMatrixBase(list[Nb]):
 
         fp16 = clip.format.sample_type == vs.FLOAT and clip.format.bits_per_sample == 16
 
+        # A linear kernel applied n times is the kernel self-convolved n times, applied once
+        if all([
+            compose, passes > 1, not bias, divisor is None, saturate, not conv_kwargs, not fp16,
+            self.mode != ConvMode.SQUARE or self.factors
+        ]):
+            composed = self.compose(passes)
+
+            if len(composed.factors[0] if composed.factors else composed) <= (25 if self.mode.is_spatial else 31):
+                return composed(clip, planes, expr_kwargs=expr_kwargs)
+
         if self.mode.is_spatial:
+            # Separable SQUARE kernels are run as an horizontal and a vertical pass.
+            # Only done with the default normalization and no negative intermediate values.
+            # Integer clips round the intermediate pass, so results can be off by one from the 2D convolution,
+            # fractional factors would be rounded on top of that, those keep the 2D convolution
+            if not bias and divisor is None and not conv_kwargs and (factors := self.factors) and min(self) >= 0 and (
+                clip.format.sample_type == vs.FLOAT or all(float(w).is_integer() for f in factors for w in f)
+            ):
+                horizontal, vertical = factors
+
+                if horizontal == vertical:
+                    return BlurMatrixBase(horizontal, ConvMode.HV)(
+                        clip, planes, passes=passes, expr_kwargs=expr_kwargs
+                    )
+
+                hpass = BlurMatrixBase(horizontal, ConvMode.HORIZONTAL)
+                vpass = BlurMatrixBase(vertical, ConvMode.VERTICAL)
+
+                return iterate(
+                    clip, lambda x: vpass(hpass(x, planes, expr_kwargs=expr_kwargs), planes, expr_kwargs=expr_kwargs),
+                    passes
+                )
+
             # std.Convolution is limited to 25 numbers
-            # SQUARE mode is not optimized
             # std.Convolution doesn't support float 16
             if len(self) <= 25 and self.mode != ConvMode.SQUARE and not fp16:
                 return iterate(clip, core.std.Convolution, passes, self, bias, divisor, planes, saturate, self.mode)
@@ -219,78 +328,31 @@ class BlurMatrixBase(list[Nb]):
 
         vars_, = ExprOp.matrix(ExprVars(len(self)), r, self.mode)
 
-        # Conditionnal for backward frames
-        condb = list([ExprList(["cond0!", "cond0@", 0])])
-
-        for i, vv in enumerate(accumulate(vars_[:r][::-1], operator.add), 1):
-            ww = list[Any]()
-
-            for j, (v, w) in enumerate(zip(vv, self[:r][::-1])):
-                ww.append([v, w, ExprOp.DUP, f"div{j}!", ExprOp.MUL])
-
-            condb.append(ExprList([f"cond{i}!", f"cond{i}@", ww, [ExprOp.ADD] * (i - 1)]))
-
-        # Conditionnal for forward frames
-        condf = list([ExprList([f"cond{i + 1}!", f"cond{i + 1}@", 0])])
-
-        for ii, vv in enumerate(accumulate(vars_[r + 1:], operator.add), i + 2):
-            ww = list[Any]()
-
-            for jj, (v, w) in enumerate(zip(vv, self[r + 1:]), j + 2):
-                ww.append([v, w, ExprOp.DUP, f"div{jj}!", ExprOp.MUL])
-
-            condf.append(ExprList([f"cond{ii}!", f"cond{ii}@", ww, [ExprOp.ADD] * (ii - i - 2)]))
-
         expr = ExprList()
 
-        # Conditionnal for backward frames
-        for i, (v, c) in enumerate(zip(vars_[:r][::-1], condb)):
-            expr.append(f"{v}._SceneChangeNext", *c)
-
-        expr.append(condb[-1][2:], ExprOp.TERN * r)
+        weighted = ExprList([vars_[r], self[r], ExprOp.MUL])
 
-        # Conditionnal for forward frames
-        for i, (v, c) in enumerate(zip(vars_[r + 1:], condf)):
-            expr.append(f"{v}._SceneChangePrev", *c)
+        # A frame across a scene change from the center frame is replaced by the center frame.
+        # Validity is propagated outwards once per side, so the expression grows linearly with the radius
+        for side, prop, frames in [
+            ('b', '_SceneChangeNext', zip(vars_[:r][::-1], self[:r][::-1])),
+            ('f', '_SceneChangePrev', zip(vars_[r + 1:], self[r + 1:]))
+        ]:
+            valid: Any = 1
 
-        expr.append(condf[-1][2:], ExprOp.TERN * r)
+            for i, (v, w) in enumerate(frames):
+                expr.append(f"{v}.{prop}", 0, valid, ExprOp.TERN, f"valid{side}{i}!")
 
-        expr.append(ExprOp.ADD, vars_[r], self[r])
+                valid = f"valid{side}{i}@"
 
-        # Center frame
-        weights_cum_b = ExprList(v for v in reversed(list(accumulate(self[:r]))))
-        weights_cum_f = ExprList(v for v in reversed(list(accumulate(self[r + 1:][::-1]))))
+                weighted.append(valid, v, vars_[r], ExprOp.TERN, w, ExprOp.MUL, ExprOp.ADD)
 
-        for k, ws in zip(range(ii), weights_cum_b + ExprList() + weights_cum_f):
-            if k == r:
-                continue
-            expr.append(f"cond{k}@", ws, ExprOp.MUL)
-
-        expr.extend([ExprOp.ADD] * k)
-        expr.append(ExprOp.DUP, f"div{r}!", ExprOp.MUL, ExprOp.ADD)
+        expr.append(weighted)
 
         if (premultiply := conv_kwargs.get("premultiply", None)):
             expr.append(premultiply, ExprOp.MUL)
 
-        if divisor:
-            expr.append(divisor, ExprOp.DIV)
-        else:
-            # Divisor conditionnal
-            for cond, rr in zip([condb, condf], [(0, r), (r + 1, r * 2 + 1)]):
-                for n, m in zip(accumulate(([d] for d in range(*rr)), initial=[0]), cond[:-1]):
-                    if (n := n[1:]):
-                        div = list[str]()
-                        for divn in n:
-                            div.append(f"div{divn}@")
-                    else:
-                        div = [str(0)]
-
-                    expr.append(str(m[0])[:5] + "@", div, [ExprOp.ADD] * max(0, len(n) - 1))
-
-                expr.append(*div, f"div{divn + 1}@", ExprOp.ADD * len(div))
-                expr.append(ExprOp.TERN * r)
-
-            expr.append(ExprOp.ADD, f"div{r}@", ExprOp.ADD, ExprOp.DIV)
+        expr.append(divisor or sum(self), ExprOp.DIV)
 
         if bias:
             expr.append(bias, ExprOp.ADD)
@@ -306,10 +368,114 @@ class BlurMatrixBase(list[Nb]):
 
         return iterate(clip, lambda x: expr(shift_clip_multi(x, (-r, r)), planes=planes, **expr_kwargs), passes)
 
+    def compose(self, passes: int) -> BlurMatrixBase[float]:
+        """
+        Kernel equivalent to convolving `passes` times with this one.
+
+        Weights are scaled down to fit std.Convolution's range if they grow past it.
+        Non separable SQUARE kernels can't be composed.
+        """
+        if self.mode == ConvMode.SQUARE:
+            if not (factors := self.factors):
+                raise CustomValueError('Only separable SQUARE kernels can be composed!', self.compose)
+
+            horizontal, vertical = (BlurMatrixBase(f, ConvMode.HV).compose(passes) for f in factors)
+
+            kernel = BlurMatrixBase([v * h for v in vertical for h in horizontal], self.mode)
+            kernel._factors = (horizontal, vertical)
+
+            return kernel
+
+        kernel: list[float] = list(self)
+
+        for _ in range(passes - 1):
+            composed = [0.0] * (len(kernel) + len(self) - 1)
+
+            for i, a in enumerate(kernel):
+                for j, b in enumerate(self):
+                    composed[i + j] += a * b
+
+            kernel = composed
+
+        if (peak := max(map(abs, kernel))) > 1023:
+            kernel = [k * 1023 / peak for k in kernel]
+
+        if all(isinstance(w, int) for w in self):
+            kernel = [round(k) for k in kernel]
+
+        return BlurMatrixBase(kernel, self.mode)
+
     def outer(self) -> Self:
-        from numpy import outer
+        kernel = self.__class__([v * h for v in self for h in self], self.mode)
+        kernel._factors = (list(self), list(self))
+
+        return kernel
+
+
+@lru_cache
+def _blur_kernel(
+    kind: str, taps: int, mode: ConvMode, *params: float
+) -> tuple[tuple[Any, ...], tuple[Any, ...] | None]:
+    # Weights of the kernel and the 1D factor of separable SQUARE kernels, shared by every identical BlurMatrix call
+    weights: list[Any]
+
+    match kind:
+        case 'CIRCLE':
+            weights = [1 for _ in range(((2 * taps + 1) ** (2 if mode == ConvMode.SQUARE else 1)) - 1)]
+            weights.insert(len(weights) // 2, 0)
+
+            return tuple(weights), None
+
+        case 'MEAN':
+            weights = [1 for _ in range(((2 * taps + 1)))]
+
+        case 'BINOMIAL':
+            c = 1
+            n = taps * 2 + 1
+
+            weights = list[int]()
+
+            for i in range(1, taps + 2):
+                weights.append(c)
+                c = c * (n - i) // i
+
+            weights = weights[:-1] + weights[::-1]
+
+        case 'LOG':
+            strength, = params
+
+            strength = max(1e-6, min(log2(3) * strength / 100, log2(3)))
+
+            weight = 0.5 ** strength / ((1 - 0.5 ** strength) * 0.5)
+
+            weights = [1.0]
+
+            for _ in range(taps):
+                weights.append(weights[-1] / weight)
+
+            weights = [*weights[::-1], *weights[1:]]
+
+        case 'GAUSS':
+            sigma, scale_value = params
+
+            if mode == ConvMode.SQUARE:
+                scale_value = sqrt(scale_value)
+
+            if sigma > 0.0:
+                half_pisqrt = 1.0 / sqrt(2.0 * pi) * sigma
+                doub_qsigma = 2 * sigma ** 2
+
+                high, *weights = [half_pisqrt * exp(-x ** 2 / doub_qsigma) for x in range(taps + 1)]
+
+                weights = [x * scale_value / high for x in weights]
+                weights = [*weights[::-1], scale_value, *weights]
+            else:
+                weights = [scale_value]
 
-        return self.__class__(outer(self, self).flatten().tolist(), self.mode)
+    if mode == ConvMode.SQUARE:
+        return tuple(v * h for v in weights for h in weights), tuple(weights)
+
+    return tuple(weights), None
 
 
 class BlurMatrix(CustomIntEnum):
@@ -328,33 +494,12 @@ class BlurMatrix(CustomIntEnum):
             mode: ConvMode = ConvMode.HV,
             **kwargs: Any
         ) -> BlurMatrixBase[float]:
-            scale_value = kwargs.get("scale_value", 1023)
-
-            if mode == ConvMode.SQUARE:
-                scale_value = sqrt(scale_value)
-
             taps = self.get_taps(sigma, taps)
 
             if taps < 0:
                 raise CustomValueError('Taps must be >= 0!')
 
-            if sigma > 0.0:
-                half_pisqrt = 1.0 / sqrt(2.0 * pi) * sigma
-                doub_qsigma = 2 * sigma ** 2
-
-                high, *mat = [half_pisqrt * exp(-x ** 2 / doub_qsigma) for x in range(taps + 1)]
-
-                mat = [x * scale_value / high for x in mat]
-                mat = [*mat[::-1], scale_value, *mat]
-            else:
-                mat = [scale_value]
-
-            kernel = BlurMatrixBase(mat, mode)
-
-            if mode == ConvMode.SQUARE:
-                kernel = kernel.outer()
-
-            return kernel
+            return BlurMatrix._from_cache('GAUSS', taps, mode, sigma, kwargs.get("scale_value", 1023))
 
         def from_radius(self, radius: int) -> BlurMatrixBase[float]:
             return self(None, sigma=(radius + 1.0) / 3)
@@ -391,52 +536,23 @@ class BlurMatrix(CustomIntEnum):
         ...
 
     def __call__(self, taps: int = 1, **kwargs: Any) -> Any:
-        kernel: BlurMatrixBase[Any]
-
         match self:
-            case BlurMatrix.CIRCLE:
-                mode = kwargs.pop("mode", ConvMode.SQUARE)
-
-                matrix = [1 for _ in range(((2 * taps + 1) ** (2 if mode == ConvMode.SQUARE else 1)) - 1)]
-                matrix.insert(len(matrix) // 2, 0)
-
-                return BlurMatrixBase[int](matrix, mode)
-
-            case BlurMatrix.MEAN:
+            case BlurMatrix.CIRCLE | BlurMatrix.MEAN:
                 mode = kwargs.pop("mode", ConvMode.SQUARE)
-
-                kernel = BlurMatrixBase[int]([1 for _ in range(((2 * taps + 1)))], mode)
-
-            case BlurMatrix.BINOMIAL:
+            case _:
                 mode = kwargs.pop("mode", ConvMode.HV)
 
-                c = 1
-                n = taps * 2 + 1
-
-                matrix = list[int]()
-
-                for i in range(1, taps + 2):
-                    matrix.append(c)
-                    c = c * (n - i) // i
-
-                kernel = BlurMatrixBase(matrix[:-1] + matrix[::-1], mode)
-
-            case BlurMatrix.LOG:
-                mode = kwargs.pop("mode", ConvMode.HV)
-                strength = kwargs.get("strength", 100)
-
-                strength = max(1e-6, min(log2(3) * strength / 100, log2(3)))
-
-                weight = 0.5 ** strength / ((1 - 0.5 ** strength) * 0.5)
+        params = (kwargs.get("strength", 100), ) if self is BlurMatrix.LOG else ()
 
-                matrixf = [1.0]
+        return BlurMatrix._from_cache(self.name, taps, mode, *params)
 
-                for _ in range(taps):
-                    matrixf.append(matrixf[-1] / weight)
+    @staticmethod
+    def _from_cache(kind: str, taps: int, mode: ConvMode, *params: float) -> BlurMatrixBase[Any]:
+        weights, factor = _blur_kernel(kind, taps, mode, *params)
 
-                kernel = BlurMatrixBase([*matrixf[::-1], *matrixf[1:]], mode)
+        kernel = BlurMatrixBase[Any](weights, mode)
 
-        if mode == ConvMode.SQUARE:
-            kernel = kernel.outer()
+        if factor is not None:
+            kernel._factors = (list(factor), list(factor))
 
         return kernel
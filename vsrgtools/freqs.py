@@ -1,16 +1,72 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from itertools import count
+from math import ceil
+from sys import maxsize
 from typing import Iterable
 
-from vsexprtools import ExprOp, ExprVars, combine, norm_expr
-from vstools import CustomIntEnum, CustomNotImplementedError, FuncExceptT, PlanesT, StrList, flatten_vnodes, vs
+from vsexprtools import ExprOp, ExprVars, complexpr_available, norm_expr
+from vstools import (
+    CustomIntEnum, CustomNotImplementedError, CustomValueError, FuncExceptT, PlanesT, core, flatten_vnodes,
+    get_neutral_value, normalize_planes, shift_clip_multi, vs
+)
+
+from .aka_expr import aka_select_expr, selection_network
 
 __all__ = [
     'MeanMode'
 ]
 
 
+@lru_cache
+def _max_expr_clips() -> int:
+    # Number of clips a single expression can reference,
+    # std.Expr and akarin before v0.96 only have the 26 letters, srcN has no such limit
+    if complexpr_available and b'src26' in core.akarin.Version()['expr_features']:
+        return maxsize
+
+    return 26
+
+
+def _network_cost(n: int, ranks: list[int]) -> int:
+    return sum(lo + hi for *_, lo, hi in selection_network(n, ranks))
+
+
+def _partial_sum(clips: list[vs.VideoNode], term: str, func: FuncExceptT) -> vs.VideoNode:
+    # Single precision sum of the term formatted with each clip, over every plane
+    if len(clips) > (limit := _max_expr_clips()):
+        n_groups = min(ceil(len(clips) / limit), limit)
+
+        return ExprOp.ADD([_partial_sum(clips[i::n_groups], term, func) for i in range(n_groups)], func=func)
+
+    assert clips[0].format
+
+    return norm_expr(
+        clips, ' '.join([*(term.format(v) for v in ExprVars(len(clips))), *[str(ExprOp.ADD)] * (len(clips) - 1)]),
+        format=clips[0].format.replace(sample_type=vs.FLOAT, bits_per_sample=32), func=func
+    )
+
+
+@lru_cache
+def _median_expr(values: tuple[str, ...]) -> str:
+    n_values = len(values)
+    mid = n_values // 2
+
+    # The first value clamped to the second one, same as the min/max clamp this used to be
+    if n_values == 2:
+        return values[1]
+
+    if n_values % 2 == 0:
+        return f'{aka_select_expr(values, [mid - 1, mid])} + 2 /'
+
+    # The median is also the first value clamped to the two middle values of the others, often a smaller network
+    if mid and _network_cost(n_values - 1, [mid - 1, mid]) + 1 < _network_cost(n_values, [mid]):
+        return f'{values[0]} {aka_select_expr(values[1:], [mid - 1, mid])} clamp'
+
+    return aka_select_expr(values, [mid])
+
+
 class MeanMode(CustomIntEnum):
     MINIMUM = -2
     HARMONIC = -1
@@ -28,6 +84,10 @@ class MeanMode(CustomIntEnum):
     MAXIMUM_ABS = 21
 
     MEDIAN = 30
+    """
+    Median of the clips, the mean of the two middle values for an even number of clips.
+    Two clips give the second one, as the first clip clamped to the others always did.
+    """
 
     def __call__(
         self, *_clips: vs.VideoNode | Iterable[vs.VideoNode], planes: PlanesT = None, func: FuncExceptT | None = None
@@ -37,71 +97,155 @@ class MeanMode(CustomIntEnum):
         clips = flatten_vnodes(_clips)
 
         n_clips = len(clips)
-        n_op = n_clips - 1
 
         if n_clips < 2:
             return next(iter(clips))
 
-        if self == MeanMode.MINIMUM:
-            return ExprOp.MIN(clips, planes=planes, func=func)
+        if n_clips > _max_expr_clips():
+            return self._reduce(clips, planes, func)
+
+        return norm_expr(clips, self._expr(tuple(str(ExprVars(n_clips)).split())), planes, func=func)
+
+    def temporal(
+        self, clip: vs.VideoNode, radius: int = 1, planes: PlanesT = None, scenechange: bool = False,
+        func: FuncExceptT | None = None
+    ) -> vs.VideoNode:
+        """
+        Mean of each frame and its ``radius`` previous and next frames.
+
+        Without scene change handling, the arithmetic mean of up to 31 frames runs through std.AverageFrames,
+        which requests the frames itself. Expressions can't, so the other modes reference a shifted clip per frame,
+        all evaluated in a single expression.
+
+        :param clip:            Clip to process.
+        :param radius:          Temporal radius.
+        :param planes:          Planes to process.
+        :param scenechange:     Replace the frames across a scene change with the current frame,
+                                using the ``_SceneChangePrev`` and ``_SceneChangeNext`` frame properties.
+        :param func:            Function returned for custom error handling.
+
+        :return:                Processed clip.
+        """
+        func = func or self.temporal
 
-        if self == MeanMode.MAXIMUM:
-            return ExprOp.MAX(clips, planes=planes, func=func)
+        if not radius:
+            return clip
+
+        assert clip.format
+
+        if all([
+            self is MeanMode.ARITHMETIC, not scenechange, radius * 2 + 1 <= 31,
+            clip.format.sample_type == vs.INTEGER or clip.format.bits_per_sample == 32
+        ]):
+            return clip.std.AverageFrames([1] * (radius * 2 + 1), planes=normalize_planes(clip, planes))
+
+        # The current frame comes first, then the previous and next frames from the closest
+        shifted = shift_clip_multi(clip, (-radius, radius))
+        clips = [shifted[radius], *shifted[:radius][::-1], *shifted[radius + 1:]]
+
+        if not scenechange:
+            return self(clips, planes=planes, func=func)
+
+        if len(clips) > _max_expr_clips():
+            raise CustomValueError('Temporal radius is too big to clamp at scene changes!', func, radius)
+
+        clip_vars = str(ExprVars(len(clips))).split()
+        center, frames = clip_vars[0], clip_vars[1:]
+
+        expr, values = list[str](), [center]
+
+        # Same as BlurMatrixBase._averageframes_akarin, validity is propagated outwards once per side
+        for side, prop, side_vars in [
+            ('b', '_SceneChangeNext', frames[:radius]), ('f', '_SceneChangePrev', frames[radius:])
+        ]:
+            valid = '1'
+
+            for i, v in enumerate(side_vars):
+                expr.append(f'{v}.{prop} 0 {valid} ? valid{side}{i}! valid{side}{i}@ {v} {center} ? tm{side}{i}!')
+
+                valid = f'valid{side}{i}@'
+                values.append(f'tm{side}{i}@')
+
+        return norm_expr(clips, ' '.join([*expr, self._expr(tuple(values))]), planes, func=func)
+
+    def _expr(self, values: tuple[str, ...]) -> str:
+        # Expression of the mean of the values, each value being evaluated once per use
+        n_values = len(values)
+        n_op = n_values - 1
+
+        if self in {MeanMode.MINIMUM, MeanMode.MAXIMUM}:
+            operator = ExprOp.MIN if self is MeanMode.MINIMUM else ExprOp.MAX
+
+            return ' '.join([values[0], *(f'{v} {operator}' for v in values[1:])])
 
         if self == MeanMode.GEOMETRIC:
-            return combine(clips, ExprOp.MUL, None, None, [1 / n_clips, ExprOp.POW], planes=planes, func=func)
+            return ' '.join([values[0], *(f'{v} {ExprOp.MUL}' for v in values[1:]), f'{1 / n_values} {ExprOp.POW}'])
 
         if self == MeanMode.LEHMER:
-            counts = range(n_clips)
-            clip_vars = ExprVars(n_clips)
-
-            expr = StrList([[f'{clip} neutral - D{i}!' for i, clip in zip(counts, clip_vars)]])
+            expr = [f'{v} neutral - D{i}!' for i, v in enumerate(values)]
 
             for y in range(2):
                 expr.extend([
-                    [f'D{i}@ {3 - y} pow' for i in counts],
-                    ExprOp.ADD * n_op, f'P{y + 1}!'
+                    *(f'D{i}@ {3 - y} pow' for i in range(n_values)),
+                    *[str(ExprOp.ADD)] * n_op, f'P{y + 1}!'
                 ])
 
             expr.append('P2@ 0 = 0 P1@ P2@ / ? neutral +')
 
-            return norm_expr(clips, expr, planes=planes, func=func)
+            return ' '.join(expr)
 
         if self in {MeanMode.RMS, MeanMode.ARITHMETIC, MeanMode.CUBIC, MeanMode.HARMONIC}:
-            return combine(
-                clips, ExprOp.ADD, f'{self.value} {ExprOp.POW}', None, [
-                    n_clips, ExprOp.DIV, 1 / self, ExprOp.POW
-                ], planes=planes, func=func
-            )
+            return ' '.join([
+                *(f'{v} {self.value} {ExprOp.POW}' for v in values), *[str(ExprOp.ADD)] * n_op,
+                f'{n_values} {ExprOp.DIV} {1 / self} {ExprOp.POW}'
+            ])
 
         if self in {MeanMode.MINIMUM_ABS, MeanMode.MAXIMUM_ABS}:
             operator = ExprOp.MIN if self is MeanMode.MINIMUM_ABS else ExprOp.MAX
 
             expr_string = ''
-            for src in ExprVars(n_clips):
-                expr_string += f'{src} neutral - abs {src.upper()}D! '
+            for i, v in enumerate(values):
+                expr_string += f'{v} neutral - abs AD{i}! '
 
-            for i, src, srcn in zip(count(), ExprVars(n_clips), ExprVars(1, n_clips)):
-                expr_string += f'{src.upper()}D@ {srcn.upper()}D@ {operator} {src} '
+            for i, v, vn in zip(count(), values, values[1:]):
+                expr_string += f'AD{i}@ AD{i + 1}@ {operator} {v} '
 
-                if i == n_clips - 2:
-                    expr_string += f'{srcn} '
+                if i == n_values - 2:
+                    expr_string += f'{vn} '
 
             expr_string += '? ' * n_op
 
-            return norm_expr(clips, expr_string, planes=planes, func=func)
+            return expr_string
 
         if self == MeanMode.MEDIAN:
-            all_clips = str(ExprVars(1, n_clips))
+            return _median_expr(values)
 
-            n_ops = n_clips - 2
+        raise CustomNotImplementedError
 
-            yzmin, yzmax = [
-                all_clips + f' {op}' * n_ops for op in (ExprOp.MIN, ExprOp.MAX)
-            ]
+    def _reduce(self, clips: list[vs.VideoNode], planes: PlanesT, func: FuncExceptT) -> vs.VideoNode:
+        # Tree reduction of more clips than an expression can reference, kept balanced by interleaving the groups
+        n_clips, limit = len(clips), _max_expr_clips()
+        n_groups = min(ceil(n_clips / limit), limit)
+        groups = [clips[i::n_groups] for i in range(n_groups)]
 
-            return norm_expr(
-                clips, f'{yzmin} YZMIN! {yzmax} YZMAX! x YZMIN@ min x = YZMIN@ x YZMAX@ max x = YZMAX@ x ? ?', planes
-            )
+        # Extrema of extrema are exact, the median of medians is an approximation of the true median
+        if self in {
+            MeanMode.MINIMUM, MeanMode.MAXIMUM, MeanMode.MINIMUM_ABS, MeanMode.MAXIMUM_ABS, MeanMode.MEDIAN
+        }:
+            return self([self(group, planes=planes, func=func) for group in groups], planes=planes, func=func)
 
-        raise CustomNotImplementedError
+        # The others are finalized from running sums, accumulated in single precision
+        if self == MeanMode.LEHMER:
+            neutral = 'neutral' if clips[0].format.sample_type == vs.FLOAT else get_neutral_value(clips[0])
+
+            sums = [_partial_sum(clips, f'{{}} {neutral} - {power} pow', func) for power in (3, 2)]
+
+            return norm_expr([clips[0], *sums], f'z 0 = 0 y z / ? {neutral} +', planes, func=func)
+
+        if self == MeanMode.GEOMETRIC:
+            return norm_expr([clips[0], _partial_sum(clips, '{} log', func)], f'y {n_clips} / exp', planes, func=func)
+
+        return norm_expr(
+            [clips[0], _partial_sum(clips, f'{{}} {self.value} pow', func)], f'y {n_clips} / {1 / self} pow',
+            planes, func=func
+        )
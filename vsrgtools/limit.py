@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+from array import array
+from functools import lru_cache
+from importlib.util import find_spec
+
 from vsexprtools import ExprVars, complexpr_available, norm_expr
 from vstools import (
     CustomIndexError, CustomValueError, PlanesT, check_ref_clip, check_variable, core, get_neutral_value,
@@ -16,7 +20,7 @@ __all__ = [
 def limit_filter(
     flt: vs.VideoNode, src: vs.VideoNode, ref: vs.VideoNode | None = None,
     mode: LimitFilterMode = LimitFilterMode.CLAMPING, planes: PlanesT = None,
-    thr: int | tuple[int, int] = 1, elast: float = 2.0, bright_thr: int | None = None
+    thr: int | tuple[int, int] = 1, elast: float = 2.0, bright_thr: int | None = None, fused: bool = False
 ) -> vs.VideoNode:
     assert check_variable(src, limit_filter)
     assert check_variable(flt, limit_filter)
@@ -74,7 +78,20 @@ def limit_filter(
         return norm_expr(clips, (
             _limit_filter_expr(got_ref, thr, elast, bright_thr, peak, mode),
             _limit_filter_expr(got_ref, thrc, elast, thrc, peak, mode)
-        ))
+        ), planes, func=limit_filter)
+
+    # Up to 10 bits, both MakeDiff and the difference Lut fit in a single Lut2 of the (flt, src) pairs.
+    # Opt-in until it's measured faster, see benchmarks/limit_filter.py
+    if fused and flt.format.bits_per_sample <= 10:
+        out = flt
+
+        if 0 in planes:
+            out = _limit_filter_lut2(out, src, elast, thr, bright_thr, [0])
+
+        if 1 in planes or 2 in planes:
+            out = _limit_filter_lut2(out, src, elast, thrc, thrc, list({*planes} - {0}))
+
+        return out
 
     diff = flt.std.MakeDiff(src, planes)
 
@@ -111,31 +128,96 @@ def _limit_filter_lut(
             [neutral_clip, diff], diff_planes, diff.format.color_family
         )
 
-    no_elast = elast <= 1
+    table = _limit_filter_table(diff.format.bits_per_sample, thr, largen_thr, elast, neutral)
 
-    def limitLut(x: int) -> int:
-        dif = x - neutral
+    return diff.std.Lut(planes, lut=table.tolist())
 
-        dif_abs = abs(dif)
 
-        thr_1 = largen_thr if dif > 0 else thr
+@lru_cache(maxsize=16)
+def _limit_filter_table(bits: int, thr: int, largen_thr: int, elast: float, neutral: int) -> array[int]:
+    # Lut of the difference clip, every call with the same parameters shares it.
+    # Stored as 16 bit values, 128 KiB at 16 bits
+    if not find_spec('numpy'):
+        return array('H', (_limit_filter_value(x, thr, largen_thr, elast, neutral) for x in range(1 << bits)))
 
-        if dif_abs <= thr_1:
-            return neutral  # type: ignore[return-value]
+    import numpy as np
 
-        if no_elast:
-            return x
+    x = np.arange(1 << bits, dtype=np.int64)
 
-        thr_2 = thr_1 * elast
+    dif = x - neutral
+    dif_abs = np.abs(dif)
 
-        if dif_abs >= thr_2:
-            return x
+    thr_1 = np.where(dif > 0, largen_thr, thr)
+    thr_2 = thr_1 * elast
 
-        thr_slope = 1 / (thr_2 - thr_1)
+    # Same operations as _limit_filter_value, dividing by the threshold range directly rounds differently
+    slope = dif * (dif_abs - thr_1) * (1 / np.where(thr_2 > thr_1, thr_2 - thr_1, 1))
+
+    table = np.where(
+        dif_abs <= thr_1, neutral, np.where((elast <= 1) | (dif_abs >= thr_2), x, np.round(slope + neutral))
+    )
+
+    return array('H', table.astype(np.uint16).tobytes())
+
+
+def _limit_filter_lut2(
+    flt: vs.VideoNode, src: vs.VideoNode, elast: float, thr: float, largen_thr: float, planes: list[int]
+) -> vs.VideoNode:
+    assert check_variable(flt, limit_filter)
+
+    neutral = get_neutral_value(flt)
+    peak = get_peak_value(flt)
+
+    table = _limit_filter_table2(
+        flt.format.bits_per_sample, int(thr * peak / 255), int(largen_thr * peak / 255), elast, neutral
+    )
+
+    return core.std.Lut2(flt, src, planes, lut=table.tolist())
+
+
+@lru_cache(maxsize=4)
+def _limit_filter_table2(bits: int, thr: int, largen_thr: int, elast: float, neutral: int) -> array[int]:
+    # Lut2 of flt - limited(flt - src), indexed by (src << bits) + flt.
+    # Stored as 16 bit values, 2 MiB at 10 bits, and only the last few are kept
+    diff_table = _limit_filter_table(bits, thr, largen_thr, elast, neutral)
+    peak = (1 << bits) - 1
+
+    if not find_spec('numpy'):
+        return array('H', (
+            min(max(x - diff_table[min(max(x - y + neutral, 0), peak)] + neutral, 0), peak)
+            for y in range(1 << bits) for x in range(1 << bits)
+        ))
+
+    import numpy as np
+
+    x = np.arange(1 << bits, dtype=np.int64)
+
+    diff = np.asarray(diff_table, np.int64)[np.clip(x[None, :] - x[:, None] + neutral, 0, peak)]
+
+    return array('H', np.clip(x[None, :] - diff + neutral, 0, peak).astype(np.uint16).tobytes())
+
+
+def _limit_filter_value(x: int, thr: int, largen_thr: int, elast: float, neutral: int) -> int:
+    dif = x - neutral
+
+    dif_abs = abs(dif)
+
+    thr_1 = largen_thr if dif > 0 else thr
+
+    if dif_abs <= thr_1:
+        return neutral
+
+    if elast <= 1:
+        return x
+
+    thr_2 = thr_1 * elast
+
+    if dif_abs >= thr_2:
+        return x
 
-        return round(dif * (dif_abs - thr_1) * thr_slope + neutral)
+    thr_slope = 1 / (thr_2 - thr_1)
 
-    return diff.std.Lut(planes, function=limitLut)
+    return round(dif * (dif_abs - thr_1) * thr_slope + neutral)
 
 
 def _limit_filter_expr(
@@ -0,0 +1,556 @@
+"""
+NumPy reference implementation of every RemoveGrain and Repair mode,
+of a running sum box blur, of a recursive Gaussian blur and of a running sum temporal mean.
+
+It mirrors the akarin expressions of `vsrgtools.aka_expr`, working on whole planes
+through a 3x3 strided view, and is used as the fallback when no plugin is available.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from importlib.util import find_spec
+from math import ceil
+from threading import local
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy.typing import NDArray
+from vstools import (
+    CustomValueError, check_variable, core, get_peak_value, normalize_planes, normalize_seq, shift_clip_multi, vs
+)
+
+__all__ = [
+    'removegrain_array', 'repair_array', 'box_blur_array', 'gauss_blur_iir_array',
+    'removegrain_numpy', 'repair_numpy', 'box_blur_numpy', 'gauss_blur_iir_numpy', 'temporal_mean_numpy'
+]
+
+ArrayT = NDArray[np.float32]
+
+# (row, col) of A1..A8 in the 3x3 window, same order as in aka_expr
+_OFFSETS = ((0, 0), (0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1), (2, 2))
+
+
+def _neighbours(arr: ArrayT, boundary: bool) -> list[ArrayT]:
+    window = sliding_window_view(np.pad(arr, 1, 'reflect' if boundary else 'edge'), (3, 3))
+
+    return [window[..., i, j] for i, j in _OFFSETS]
+
+
+def _select(conds: Sequence[NDArray[np.bool_]], values: Sequence[ArrayT], default: ArrayT) -> ArrayT:
+    return np.select(conds, values, default)
+
+
+def _clamp(x: ArrayT, lo: ArrayT, hi: ArrayT) -> ArrayT:
+    return np.minimum(np.maximum(x, lo), hi)
+
+
+def _pairs(n: list[ArrayT], pairs: Sequence[tuple[int, int]]) -> tuple[list[ArrayT], list[ArrayT]]:
+    return [np.minimum(n[a], n[b]) for a, b in pairs], [np.maximum(n[a], n[b]) for a, b in pairs]
+
+
+_LINES = ((0, 7), (1, 6), (2, 5), (3, 4))
+
+
+def _pick_line(diffs: list[ArrayT], values: list[ArrayT]) -> ArrayT:
+    # Same priority as the expressions: line 4, then 2, 3 and 1
+    mindiff = np.minimum.reduce(diffs)
+
+    return _select([mindiff == diffs[i] for i in (3, 1, 2)], [values[i] for i in (3, 1, 2)], values[0])
+
+
+def _line_clip(x: ArrayT, mil: list[ArrayT], mal: list[ArrayT], weight: Callable[..., ArrayT]) -> ArrayT:
+    clamps = [_clamp(x, lo, hi) for lo, hi in zip(mil, mal)]
+
+    return _pick_line([weight(x, cl, hi - lo) for cl, lo, hi in zip(clamps, mil, mal)], clamps)
+
+
+def _line_weight(mode: int) -> Callable[[ArrayT, ArrayT, ArrayT], ArrayT]:
+    if mode == 6:
+        return lambda x, cl, d: np.abs(x - cl) * 2 + d
+
+    if mode == 7:
+        return lambda x, cl, d: np.abs(x - cl) + d
+
+    return lambda x, cl, d: np.abs(x - cl) + d * 2
+
+
+def _clip_minmax(x: ArrayT, mil: list[ArrayT], mal: list[ArrayT]) -> ArrayT:
+    maxmil, minmal = np.maximum.reduce(mil), np.minimum.reduce(mal)
+
+    return _clamp(x, np.minimum(maxmil, minmal), np.maximum(maxmil, minmal))
+
+
+_SMART_PAIRS = {
+    26: ((0, 1), (1, 2), (2, 4), (4, 7), (6, 7), (5, 6), (3, 5), (0, 3)),
+    27: ((0, 7), (0, 1), (6, 7), (1, 6), (1, 2), (5, 6), (2, 5), (2, 4), (3, 5), (3, 4), (4, 7), (0, 3)),
+    28: ((0, 1), (1, 2), (2, 4), (4, 7), (6, 7), (5, 6), (3, 5), (0, 4), (0, 7), (2, 5), (1, 6), (3, 4)),
+}
+
+
+def _bob(c: ArrayT, n: list[ArrayT], mode: int) -> ArrayT:
+    a1, a2, a3, _, _, a6, a7, a8 = n
+
+    d1, d2, d3 = np.abs(a1 - a8), np.abs(a2 - a7), np.abs(a3 - a6)
+    mindiff = np.minimum.reduce([d1, d2, d3])
+
+    if mode in {13, 14}:
+        out = _select([mindiff == d2, mindiff == d3], [(a2 + a7) / 2, (a3 + a6) / 2], (a1 + a8) / 2)
+    else:
+        avg = (a1 + a2 * 2 + a3 + a6 + a7 * 2 + a8) / 8
+        out = _select(
+            [mindiff == d2, mindiff == d3],
+            [_clamp(avg, np.minimum(a2, a7), np.maximum(a2, a7)), _clamp(avg, np.minimum(a3, a6), np.maximum(a3, a6))],
+            _clamp(avg, np.minimum(a1, a8), np.maximum(a1, a8))
+        )
+
+    # Top field modes interpolate the even rows, bottom field modes the odd ones
+    rows = np.arange(c.shape[0])[:, None] % 2 == (0 if mode in {13, 15} else 1)
+
+    return np.where(rows, out, c)
+
+
+def _edge_dehalo(c: ArrayT, mil: list[ArrayT], mal: list[ArrayT], mode: int, peak_min: float) -> ArrayT:
+    linediff = [hi - lo for lo, hi in zip(mil, mal)]
+
+    if mode == 23:
+        u = np.maximum(np.maximum.reduce([np.minimum(c - hi, ld) for hi, ld in zip(mal, linediff)]), peak_min)
+        d = np.maximum(np.maximum.reduce([np.minimum(lo - c, ld) for lo, ld in zip(mil, linediff)]), peak_min)
+    else:
+        u = np.maximum(np.maximum.reduce([
+            np.minimum(ld - (c - hi), c - hi) for hi, ld in zip(mal, linediff)
+        ]), peak_min)
+        d = np.maximum(np.maximum.reduce([
+            np.minimum(ld - (lo - c), lo - c) for lo, ld in zip(mil, linediff)
+        ]), peak_min)
+
+    return c - u + d
+
+
+def removegrain_array(arr: NDArray[Any], mode: int, chroma: bool = False, boundary: bool = False) -> ArrayT:
+    """
+    Apply a RemoveGrain mode to a single plane.
+
+    :param arr:         2D plane.
+    :param mode:        RemoveGrain mode.
+    :param chroma:      Whether the plane is a chroma plane. Only used by modes 23 and 24.
+    :param boundary:    Edge handling of the neighbourhood: mirrored if True, clamped otherwise.
+
+    :return:            Unrounded float32 result.
+    """
+    c = np.asarray(arr, np.float32)
+
+    if mode in {0, 25}:
+        return c.copy()
+
+    n = _neighbours(c, boundary)
+
+    if mode == 1:
+        return _clamp(c, np.minimum.reduce(n), np.maximum.reduce(n))
+
+    if mode in {2, 3, 4}:
+        s = np.sort(np.stack(n), 0)
+        return _clamp(c, s[mode - 1], s[8 - mode])
+
+    if mode in {5, 6, 7, 8, 9, 17}:
+        mil, mal = _pairs(n, _LINES)
+
+        if mode == 5:
+            return _line_clip(c, mil, mal, lambda x, cl, d: np.abs(x - cl))
+
+        if mode == 9:
+            return _pick_line([hi - lo for lo, hi in zip(mil, mal)], [_clamp(c, lo, hi) for lo, hi in zip(mil, mal)])
+
+        if mode == 17:
+            return _clip_minmax(c, mil, mal)
+
+        return _line_clip(c, mil, mal, _line_weight(mode))
+
+    if mode == 10:
+        d = [np.abs(c - a) for a in n]
+        mindiff = np.minimum.reduce(d)
+        order = (6, 7, 5, 1, 2, 0, 4)
+        return _select([mindiff == d[i] for i in order], [n[i] for i in order], n[3])
+
+    if mode in {11, 12}:
+        return (c * 4 + (n[1] + n[3] + n[4] + n[6]) * 2 + n[0] + n[2] + n[5] + n[7]) / 16
+
+    if mode in {13, 14, 15, 16}:
+        return _bob(c, n, mode)
+
+    if mode == 18:
+        return _pick_line(
+            [np.maximum(np.abs(c - n[a]), np.abs(c - n[b])) for a, b in _LINES],
+            [_clamp(c, lo, hi) for lo, hi in zip(*_pairs(n, _LINES))]
+        )
+
+    if mode == 19:
+        return np.add.reduce(n) / 8
+
+    if mode == 20:
+        return (c + np.add.reduce(n)) / 9
+
+    if mode in {21, 22}:
+        av = [(n[a] + n[b]) / 2 for a, b in _LINES]
+        return _clamp(c, np.minimum.reduce(av), np.maximum.reduce(av))
+
+    if mode in {23, 24}:
+        return _edge_dehalo(c, *_pairs(n, _LINES), mode, -0.5 if chroma else 0)
+
+    if mode in _SMART_PAIRS:
+        return _clip_minmax(c, *_pairs(n, _SMART_PAIRS[mode]))
+
+    raise CustomValueError('Invalid RemoveGrain mode!', removegrain_array, mode)
+
+
+def repair_array(arr: NDArray[Any], ref: NDArray[Any], mode: int, boundary: bool = False) -> ArrayT:
+    """
+    Apply a Repair mode to a single plane.
+
+    :param arr:         2D plane to repair.
+    :param ref:         2D reference plane.
+    :param mode:        Repair mode.
+    :param boundary:    Edge handling of the neighbourhood: mirrored if True, clamped otherwise.
+
+    :return:            Unrounded float32 result.
+    """
+    x = np.asarray(arr, np.float32)
+    y = np.asarray(ref, np.float32)
+
+    if mode in {0, 25}:
+        return x.copy()
+
+    n = _neighbours(y, boundary)
+
+    if mode in {1, 2, 3, 4}:
+        s = np.sort(np.stack([*n, y]), 0)
+        return _clamp(x, s[mode - 1], s[9 - mode])
+
+    if mode in {11, 12, 13, 14}:
+        s = np.sort(np.stack(n), 0)
+        return _clamp(x, np.minimum(y, s[mode - 11]), np.maximum(y, s[18 - mode]))
+
+    if mode in {5, 6, 7, 8, 9}:
+        mil, mal = _pairs(n, _LINES)
+        mil, mal = [np.minimum(y, lo) for lo in mil], [np.maximum(y, hi) for hi in mal]
+
+        if mode == 5:
+            return _line_clip(x, mil, mal, lambda v, cl, d: np.abs(v - cl))
+
+        if mode == 9:
+            return _pick_line([hi - lo for lo, hi in zip(mil, mal)], [_clamp(x, lo, hi) for lo, hi in zip(mil, mal)])
+
+        return _line_clip(x, mil, mal, _line_weight(mode))
+
+    if mode == 10:
+        d = [np.abs(x - a) for a in n]
+        dc = np.abs(x - y)
+        mindiff = np.minimum(np.minimum.reduce(d), dc)
+        order = (6, 7, 5, 1, 2, 0, 4)
+        return _select(
+            [*(mindiff == d[i] for i in order), mindiff == dc], [*(n[i] for i in order), y], n[3]
+        )
+
+    if mode in {15, 16, 17}:
+        mil, mal = _pairs(n, _LINES)
+
+        if mode == 17:
+            maxmil, minmal = np.maximum.reduce(mil), np.minimum.reduce(mal)
+            return _clamp(
+                x, np.minimum(y, np.minimum(maxmil, minmal)), np.maximum(y, np.maximum(maxmil, minmal))
+            )
+
+        if mode == 15:
+            c = [np.abs(y - _clamp(y, lo, hi)) for lo, hi in zip(mil, mal)]
+        else:
+            c = [np.abs(y - _clamp(y, lo, hi)) * 2 + (hi - lo) for lo, hi in zip(mil, mal)]
+
+        return _pick_line(c, [_clamp(x, np.minimum(y, lo), np.maximum(y, hi)) for lo, hi in zip(mil, mal)])
+
+    if mode == 18:
+        return _pick_line(
+            [np.maximum(np.abs(y - n[a]), np.abs(y - n[b])) for a, b in _LINES],
+            [_clamp(x, np.minimum(lo, y), np.maximum(hi, y)) for lo, hi in zip(*_pairs(n, _LINES))]
+        )
+
+    if mode in {19, 22}:
+        src, val = (y, x) if mode == 19 else (x, y)
+        mindiff = np.minimum.reduce([np.abs(src - a) for a in n])
+        return _clamp(val, src - mindiff, src + mindiff)
+
+    if mode in {20, 23}:
+        src, val = (y, x) if mode == 20 else (x, y)
+        # second smallest absolute difference
+        maxdiff = np.sort(np.stack([np.abs(src - a) for a in n]), 0)[1]
+        return _clamp(val, src - maxdiff, src + maxdiff)
+
+    if mode in {21, 24}:
+        src, val = (y, x) if mode == 21 else (x, y)
+        mil, mal = _pairs(n, _LINES)
+        u = np.minimum.reduce([np.maximum(hi - src, src - lo) for lo, hi in zip(mil, mal)])
+        return _clamp(val, src - u, src + u)
+
+    if mode in _SMART_PAIRS:
+        mil, mal = _pairs(n, _SMART_PAIRS[mode])
+        maxmil, minmal = np.maximum.reduce(mil), np.minimum.reduce(mal)
+        return _clamp(x, np.minimum(y, np.minimum(maxmil, minmal)), np.maximum(y, np.maximum(maxmil, minmal)))
+
+    raise CustomValueError('Invalid Repair mode!', repair_array, mode)
+
+
+def _sliding_mean(arr: NDArray[np.float64], radius: int, axis: int) -> NDArray[np.float64]:
+    size = arr.shape[axis]
+
+    # mirrored edges, same as the convolution based box blur
+    padded = np.pad(arr, [(radius, radius) if i == axis else (0, 0) for i in range(arr.ndim)], 'reflect')
+
+    csum = np.cumsum(padded, axis, dtype=np.float64)
+    csum = np.concatenate([np.zeros_like(csum.take([0], axis)), csum], axis)
+
+    return (csum.take(range(2 * radius + 1, size + 2 * radius + 1), axis) - csum.take(range(size), axis)) / (
+        2 * radius + 1
+    )
+
+
+def box_blur_array(
+    arr: NDArray[Any], hradius: int = 1, hpasses: int = 1, vradius: int = 1, vpasses: int = 1
+) -> ArrayT:
+    """
+    Box blur of a single plane through sliding sums, so the cost doesn't depend on the radius.
+
+    Every pass is a new sliding sum over the previous pass, horizontal passes are done first.
+    """
+
+    out = arr.astype(np.float64)
+
+    for radius, passes, axis in ((hradius, hpasses, 1), (vradius, vpasses, 0)):
+        for _ in range(passes if radius else 0):
+            out = _sliding_mean(out, radius, axis)
+
+    return out.astype(np.float32)
+
+
+# Deriche, "Recursively implementing the Gaussian and its derivatives", 1993
+# (alpha, beta, lambda, omega) of the kernel terms
+# (alpha * cos(omega * n / sigma) + beta * sin(omega * n / sigma)) * exp(-lambda * n / sigma)
+_DERICHE_TERMS = ((1.6800, 3.7350, 1.7830, 0.6318), (-0.6803, -0.2598, 1.7230, 1.9970))
+
+
+@lru_cache
+def _deriche_coefficients(sigma: float) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    # returns the causal and anti-causal numerators and the shared denominator
+    poles, residues = list[complex](), list[complex]()
+
+    for alpha, beta, lambd, omega in _DERICHE_TERMS:
+        pole = np.exp(-complex(lambd, omega) / sigma)
+        poles += [pole, pole.conjugate()]
+        residues += [complex(alpha, beta) / 2, complex(alpha, -beta) / 2]
+
+    den = np.poly(poles).real
+    num = sum(
+        (res * np.poly([p for k, p in enumerate(poles) if k != j]) for j, res in enumerate(residues)),
+        np.zeros(4, complex)
+    ).real
+
+    # the anti-causal part starts one sample away, so h(0) is only counted once
+    num_ac = np.append(num, 0.0) - num[0] * den
+
+    norm = (num.sum() + num_ac.sum()) / den.sum()
+
+    return num / norm, num_ac / norm, den
+
+
+def _recursive_filter(
+    lines: NDArray[np.float64], b: NDArray[np.float64], a: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    # causal filter along the first axis, started in the steady state of the first sample
+    if find_spec('scipy'):
+        from scipy.signal import lfilter, lfilter_zi  # type: ignore[import-untyped]
+
+        return lfilter(b, a, lines, 0, np.multiply.outer(lfilter_zi(b, a), lines[0]))[0]
+
+    out = np.empty_like(lines)
+
+    xs = [lines[0]] * len(b)
+    ys = [lines[0] * (b.sum() / a.sum())] * len(a)
+
+    for i, line in enumerate(lines):
+        xs = [line, *xs[:-1]]
+        ys = [sum(bk * xk for bk, xk in zip(b, xs)) - sum(ak * yk for ak, yk in zip(a[1:], ys[:-1])), *ys[:-1]]
+        out[i] = ys[0]
+
+    return out
+
+
+def gauss_blur_iir_array(arr: NDArray[Any], sigma_h: float = 0.0, sigma_v: float = 0.0) -> ArrayT:
+    """
+    Gaussian blur of a single plane with Deriche's fourth order recursive filter.
+
+    The causal and anti-causal halves of the kernel are run along each axis,
+    so the cost per pixel doesn't depend on sigma.
+    Edges are mirrored by ``4 * sigma`` pixels, the padding being the only part growing with sigma.
+
+    Measured against the exact sampled kernel for ``0.5 <= sigma <= 20``,
+    the peak error of the impulse response stays below 0.05% of the kernel peak.
+    Sigmas below 0.5 aren't supported by the approximation and leave the axis unchanged.
+    """
+
+    out = arr.astype(np.float64)
+
+    for sigma, axis in ((sigma_h, 1), (sigma_v, 0)):
+        if sigma < 0.5:
+            continue
+
+        lines = np.moveaxis(out, axis, 0)
+        size = lines.shape[0]
+        pad = min(ceil(4 * sigma), size - 1)
+        num, num_ac, den = _deriche_coefficients(float(sigma))
+
+        lines = np.pad(lines, [(pad, pad)] + [(0, 0)] * (lines.ndim - 1), 'reflect')
+        lines = _recursive_filter(lines, num, den) + _recursive_filter(lines[::-1], num_ac, den)[::-1]
+
+        out = np.moveaxis(lines[pad:pad + size], 0, axis)
+
+    return out.astype(np.float32)
+
+
+def _modify_planes(
+    clips: list[vs.VideoNode], modes: list[int], func: Callable[[list[ArrayT], int, int], ArrayT]
+) -> vs.VideoNode:
+    fmt = clips[0].format
+    assert fmt
+
+    peak = get_peak_value(clips[0]) if fmt.sample_type == vs.INTEGER else None
+
+    def _process(n: int, f: list[vs.VideoFrame]) -> vs.VideoFrame:
+        fout = f[0].copy()
+
+        for i, mode in enumerate(modes):
+            if not mode:
+                continue
+
+            out = func([np.asarray(frame[i]) for frame in f], mode, i)
+
+            if peak is not None:
+                out = np.clip(np.rint(out), 0, peak)
+
+            np.copyto(np.asarray(fout[i]), out, 'unsafe')
+
+        return fout
+
+    return core.std.ModifyFrame(clips[0], clips, _process)
+
+
+def removegrain_numpy(clip: vs.VideoNode, mode: int | Sequence[int]) -> vs.VideoNode:
+    """RemoveGrain through the NumPy engine, one ModifyFrame call for all planes."""
+
+    assert check_variable(clip, removegrain_numpy)
+
+    modes = normalize_seq(mode, clip.format.num_planes)
+
+    return _modify_planes(
+        [clip], modes, lambda planes, m, i: removegrain_array(planes[0], m, i > 0 and clip.format.num_planes > 1)
+    )
+
+
+def repair_numpy(clip: vs.VideoNode, repairclip: vs.VideoNode, mode: int | Sequence[int]) -> vs.VideoNode:
+    """Repair through the NumPy engine, one ModifyFrame call for all planes."""
+
+    assert check_variable(clip, repair_numpy)
+    assert check_variable(repairclip, repair_numpy)
+
+    modes = normalize_seq(mode, clip.format.num_planes)
+
+    return _modify_planes([clip, repairclip], modes, lambda planes, m, i: repair_array(planes[0], planes[1], m))
+
+
+def box_blur_numpy(
+    clip: vs.VideoNode, planes: int | Sequence[int] | None = None,
+    hradius: int = 1, hpasses: int = 1, vradius: int = 1, vpasses: int = 1
+) -> vs.VideoNode:
+    """Box blur through the NumPy engine, with the same arguments as std.BoxBlur."""
+
+    assert check_variable(clip, box_blur_numpy)
+
+    planes = normalize_planes(clip, planes)
+
+    return _modify_planes(
+        [clip], [int(i in planes) for i in range(clip.format.num_planes)],
+        lambda p, m, i: box_blur_array(p[0], hradius, hpasses, vradius, vpasses)
+    )
+
+
+def gauss_blur_iir_numpy(
+    clip: vs.VideoNode, sigma_h: float = 0.0, sigma_v: float = 0.0, planes: int | Sequence[int] | None = None
+) -> vs.VideoNode:
+    """Recursive Gaussian blur through the NumPy engine, see `gauss_blur_iir_array`."""
+
+    assert check_variable(clip, gauss_blur_iir_numpy)
+
+    planes = normalize_planes(clip, planes)
+
+    return _modify_planes(
+        [clip], [int(i in planes) for i in range(clip.format.num_planes)],
+        lambda p, m, i: gauss_blur_iir_array(p[0], sigma_h, sigma_v)
+    )
+
+
+def temporal_mean_numpy(
+    clip: vs.VideoNode, radius: int = 1, planes: int | Sequence[int] | None = None, resync: int = 64
+) -> vs.VideoNode:
+    """
+    Temporal mean of ``2 * radius + 1`` frames, each frame's sum being derived from the previous one.
+
+    Every output frame requests ``2 * radius + 2`` frames through ModifyFrame, the window and the frame
+    leaving it, so the number of fetches is O(radius), one more than std.AverageFrames.
+    Only the summing is O(1): every thread keeps the sums of the last frame it processed,
+    and when it processes the next one, only the entering and leaving frames are added and subtracted.
+    Under VapourSynth's thread pool that's rarely the same thread, so most frames sum the whole window again,
+    as they also do every ``resync`` frames, bounding float drift.
+    Edge frames are repeated, same as std.AverageFrames.
+
+    Only used when requested with ``box_blur(..., mode=ConvMode.TEMPORAL, backend=Backend.NUMPY)``,
+    see ``benchmarks/temporal_mean.py`` for a comparison with std.AverageFrames.
+    """
+
+    assert check_variable(clip, temporal_mean_numpy)
+
+    planes = normalize_planes(clip, planes)
+
+    if not radius:
+        return clip
+
+    peak = get_peak_value(clip) if clip.format.sample_type == vs.INTEGER else None
+    size = 2 * radius + 1
+
+    state = local()
+
+    def _process(n: int, f: list[vs.VideoFrame]) -> vs.VideoFrame:
+        leaving, *window = f
+
+        if getattr(state, 'n', None) == n - 1 and n % resync:
+            sums = [
+                s + np.asarray(window[-1][i], np.float64) - np.asarray(leaving[i], np.float64)
+                for s, i in zip(state.sums, planes)
+            ]
+        else:
+            sums = [sum((np.asarray(frame[i], np.float64) for frame in window), np.float64(0)) for i in planes]
+
+        state.n, state.sums = n, sums
+
+        fout = window[radius].copy()
+
+        for s, i in zip(sums, planes):
+            out = s / size
+
+            if peak is not None:
+                out = np.clip(np.rint(out), 0, peak)
+
+            np.copyto(np.asarray(fout[i]), out, 'unsafe')
+
+        return fout
+
+    # frames n - radius - 1 to n + radius
+    return core.std.ModifyFrame(clip, shift_clip_multi(clip, (-radius - 1, radius)), _process)
@@ -1,24 +1,40 @@
 from __future__ import annotations
 
-from vsexprtools import complexpr_available, expr_func
-from vstools import NotFoundEnumValue, PlanesT, check_variable, core, normalize_seq, pick_func_stype, vs
+from vsexprtools import complexpr_available, expr_func, norm_expr
+from vstools import (
+    CustomValueError, FuncExceptT, NotFoundEnumValue, PlanesT, check_variable, core, normalize_seq, pick_func_stype,
+    shift_clip, vs
+)
 
 from .aka_expr import (
-    aka_removegrain_expr_11_12, aka_removegrain_expr_19, aka_removegrain_expr_20, aka_removegrain_expr_23,
-    aka_removegrain_expr_24, removegrain_aka_exprs, repair_aka_exprs
+    aka_backward_clense_expr, aka_clense_expr, aka_forward_clense_expr, aka_vertical_cleaner_expr_1,
+    aka_vertical_cleaner_expr_2, get_removegrain_aka_exprs, get_removegrain_repair_aka_exprs, get_repair_aka_exprs
 )
 from .enum import (
     BlurMatrix, RemoveGrainMode, RemoveGrainModeT, RepairMode, RepairModeT, VerticalCleanerMode, VerticalCleanerModeT
 )
+from .tuner import Backend, backend_tuner
 
 __all__ = [
-    'repair', 'removegrain',
+    'repair', 'removegrain', 'removegrain_repair',
     'clense', 'backward_clense', 'forward_clense',
     'vertical_cleaner'
 ]
 
 
-def repair(clip: vs.VideoNode, repairclip: vs.VideoNode, mode: RepairModeT) -> vs.VideoNode:
+def repair(
+    clip: vs.VideoNode, repairclip: vs.VideoNode, mode: RepairModeT, backend: Backend | str | None = None
+) -> vs.VideoNode:
+    """
+    :param clip:            Clip to repair.
+    :param repairclip:      Reference clip.
+    :param mode:            Repair mode(s) for each plane.
+    :param backend:         Force a specific implementation.
+                            Defaults to the tuned backend if the tuner is enabled,
+                            else akarin > rgvs > zsmooth > numpy.
+
+    :return:                Repaired clip.
+    """
     assert check_variable(clip, repair)
     assert check_variable(repairclip, repair)
 
@@ -28,7 +44,27 @@ def repair(clip: vs.VideoNode, repairclip: vs.VideoNode, mode: RepairModeT) -> v
     if not sum(mode):
         return clip
 
-    if not complexpr_available:
+    backend = Backend.from_param(backend, repair) or backend_tuner.get(repair, mode, clip)
+
+    if backend is None:
+        if complexpr_available:
+            backend = Backend.AKARIN
+        elif hasattr(core, 'rgvs'):
+            backend = Backend.RGVS
+        elif hasattr(core, 'zsmooth'):
+            backend = Backend.ZSMOOTH
+        else:
+            backend = Backend.NUMPY
+
+    if backend is Backend.ZSMOOTH:
+        return clip.zsmooth.Repair(repairclip, mode)
+
+    if backend is Backend.NUMPY:
+        from .rgnumpy import repair_numpy
+
+        return repair_numpy(clip, repairclip, mode)
+
+    if backend is Backend.RGVS:
         if (RepairMode.CLIP_REF_RG20 in mode or RepairMode.CLIP_REF_RG23 in mode) and is_float:
             raise NotFoundEnumValue(
                 'Specified RepairMode for rgsf is not implemented!', repair, reason=iter(mode)
@@ -36,12 +72,25 @@ def repair(clip: vs.VideoNode, repairclip: vs.VideoNode, mode: RepairModeT) -> v
 
         return pick_func_stype(clip, core.rgvs.Repair, core.rgsf.Repair)(clip, repairclip, mode)
 
+    if backend is not Backend.AKARIN:
+        raise CustomValueError('Unsupported backend!', repair, backend)
+
     return core.akarin.Expr(
-        [clip, repairclip], [repair_aka_exprs[m]() for m in mode], clip.format.id, True
+        [clip, repairclip], list(get_repair_aka_exprs(tuple(mode), clip.format.sample_type, clip.format.num_planes)),
+        clip.format.id, True
     )
 
 
-def removegrain(clip: vs.VideoNode, mode: RemoveGrainModeT) -> vs.VideoNode:
+def removegrain(clip: vs.VideoNode, mode: RemoveGrainModeT, backend: Backend | str | None = None) -> vs.VideoNode:
+    """
+    :param clip:            Clip to process.
+    :param mode:            RemoveGrain mode(s) for each plane.
+    :param backend:         Force a specific implementation.
+                            Defaults to the tuned backend if the tuner is enabled,
+                            else zsmooth > rgvs > akarin > numpy.
+
+    :return:                Processed clip.
+    """
     assert check_variable(clip, removegrain)
 
     mode = normalize_seq(mode, clip.format.num_planes)
@@ -50,64 +99,219 @@ def removegrain(clip: vs.VideoNode, mode: RemoveGrainModeT) -> vs.VideoNode:
     if not sum(mode):
         return clip
 
-    if clip.format.sample_type == vs.INTEGER and all(m in range(24 + 1) for m in mode):
+    backend = Backend.from_param(backend, removegrain) or backend_tuner.get(removegrain, mode, clip)
+
+    if backend is None and clip.format.sample_type == vs.INTEGER and all(m in range(24 + 1) for m in mode):
         if hasattr(core, "zsmooth"):
-            return clip.zsmooth.RemoveGrain(mode)
+            backend = Backend.ZSMOOTH
+        elif hasattr(core, 'rgvs'):
+            backend = Backend.RGVS
 
-        if hasattr(core, 'rgvs'):
-            return clip.rgvs.RemoveGrain(mode)
+    if backend is None and not complexpr_available:
+        backend = Backend.ZSMOOTH if hasattr(core, 'zsmooth') else Backend.NUMPY
 
-    if not complexpr_available:
+    if backend is Backend.RGVS:
+        return pick_func_stype(clip, core.lazy.rgvs.RemoveGrain, core.lazy.rgsf.RemoveGrain)(clip, mode)
+
+    if backend is Backend.ZSMOOTH:
         return clip.zsmooth.RemoveGrain(mode)
 
-    expr = list[str]()
+    if backend is Backend.NUMPY:
+        from .rgnumpy import removegrain_numpy
+
+        return removegrain_numpy(clip, mode)
 
-    for idx, m in enumerate(mode):
-        if m == RemoveGrainMode.BINOMIAL_BLUR:
-            if all(mm == m for mm in mode):
-                return BlurMatrix.BINOMIAL()(clip)
-            expr.append(aka_removegrain_expr_11_12())
+    if backend not in {None, Backend.AKARIN}:
+        raise CustomValueError('Unsupported backend!', removegrain, backend)
+
+    if all(m == RemoveGrainMode.BINOMIAL_BLUR for m in mode):
+        return BlurMatrix.BINOMIAL()(clip)
+
+    if set(mode) == {RemoveGrainMode.BOX_BLUR_NO_CENTER}:
+        return BlurMatrix.CIRCLE()(clip)
+
+    if set(mode) == {RemoveGrainMode.BOX_BLUR}:
+        return BlurMatrix.MEAN()(clip)
+
+    expr = list(get_removegrain_aka_exprs(tuple(mode), clip.format.sample_type, clip.format.num_planes))
+
+    return expr_func(clip, expr, opt=True, boundary=False)
+
+
+def removegrain_repair(clip: vs.VideoNode, rg_mode: RemoveGrainModeT, rp_mode: RepairModeT) -> vs.VideoNode:
+    """
+    Fused ``repair(removegrain(clip, rg_mode), clip, rp_mode)``.
+
+    With akarin available, both filters are evaluated in a single expression,
+    so the intermediate RemoveGrain frame is never created.
+
+    :param clip:        Clip to process.
+    :param rg_mode:     RemoveGrain mode(s) applied to the clip.
+    :param rp_mode:     Repair mode(s) used to limit the RemoveGrain result to the source clip.
+
+    :return:            Processed clip.
+    """
+    assert check_variable(clip, removegrain_repair)
+
+    rg_mode = list(map(RemoveGrainMode, normalize_seq(rg_mode, clip.format.num_planes)))
+    rp_mode = normalize_seq(rp_mode, clip.format.num_planes)
+
+    if not sum(rp_mode):
+        return removegrain(clip, rg_mode)
+
+    if not complexpr_available:
+        return repair(removegrain(clip, rg_mode), clip, rp_mode)
 
-        elif RemoveGrainMode.BOB_TOP_CLOSE <= m <= RemoveGrainMode.BOB_BOTTOM_INTER:
-            return pick_func_stype(clip, core.lazy.rgvs.RemoveGrain, core.lazy.zsmooth.RemoveGrain)(clip, mode)
+    expr = get_removegrain_repair_aka_exprs(
+        tuple(rg_mode), tuple(rp_mode), clip.format.sample_type, clip.format.num_planes
+    )
 
-        elif m == RemoveGrainMode.BOX_BLUR_NO_CENTER:
-            if set(mode) == {RemoveGrainMode.BOX_BLUR_NO_CENTER}:
-                return BlurMatrix.CIRCLE()(clip)
-            expr.append(aka_removegrain_expr_19())
+    return expr_func(clip, list(expr), opt=True, boundary=False)
 
-        elif m == RemoveGrainMode.BOX_BLUR:
-            if set(mode) == {RemoveGrainMode.BOX_BLUR}:
-                return BlurMatrix.MEAN()(clip)
-            expr.append(aka_removegrain_expr_20())
 
-        elif m == RemoveGrainMode.EDGE_DEHALO:
-            expr.append(aka_removegrain_expr_23(0 if idx == 0 else -0.5))
+def _cleaner_backend(clip: vs.VideoNode, backend: Backend | str | None, func: FuncExceptT) -> Backend:
+    assert clip.format
 
-        elif m == RemoveGrainMode.EDGE_DEHALO2:
-            expr.append(aka_removegrain_expr_24(0 if idx == 0 else -0.5))
+    backend = Backend.from_param(backend, func)
 
+    if backend is None:
+        if hasattr(core, 'zsmooth'):
+            backend = Backend.ZSMOOTH
+        elif hasattr(core, 'rgvs') and (
+            clip.format.sample_type == vs.INTEGER or (clip.format.bits_per_sample == 32 and hasattr(core, 'rgsf'))
+        ):
+            backend = Backend.RGVS
         else:
-            expr.append(removegrain_aka_exprs[m]())
+            backend = Backend.AKARIN
+
+    if backend not in {Backend.ZSMOOTH, Backend.RGVS, Backend.AKARIN}:
+        raise CustomValueError('Unsupported backend!', func, backend)
 
-    return expr_func(clip, expr, opt=True)
+    return backend
 
 
 def clense(
     clip: vs.VideoNode,
     previous_clip: vs.VideoNode | None = None, next_clip: vs.VideoNode | None = None,
-    planes: PlanesT = None
+    planes: PlanesT = None, backend: Backend | str | None = None
 ) -> vs.VideoNode:
-    return pick_func_stype(clip, core.lazy.rgvs.Clense, core.lazy.rgsf.Clense)(clip, previous_clip, next_clip, planes)
+    """
+    Temporal median of the previous, current and next frame.
+    The first and last frames are returned unchanged.
+
+    :param clip:            Clip to process.
+    :param previous_clip:   Clip the previous frames are taken from. Defaults to `clip`.
+    :param next_clip:       Clip the next frames are taken from. Defaults to `clip`.
+    :param planes:          Planes to process.
+    :param backend:         Force a specific implementation.
+                            Defaults to zsmooth > rgvs > akarin.
+
+    :return:                Processed clip.
+    """
+    assert check_variable(clip, clense)
+
+    backend = _cleaner_backend(clip, backend, clense)
+
+    if backend is Backend.ZSMOOTH:
+        return clip.zsmooth.Clense(previous=previous_clip, next=next_clip, planes=planes)
+
+    if backend is Backend.RGVS:
+        return pick_func_stype(clip, core.lazy.rgvs.Clense, core.lazy.rgsf.Clense)(
+            clip, previous_clip, next_clip, planes
+        )
+
+    return norm_expr(
+        [clip, shift_clip(previous_clip or clip, -1), shift_clip(next_clip or clip, 1)],
+        aka_clense_expr(clip.num_frames), planes, force_akarin=clense
+    )
+
+
+def forward_clense(clip: vs.VideoNode, planes: PlanesT = None, backend: Backend | str | None = None) -> vs.VideoNode:
+    """
+    Clamp each frame to the median of the next frame and its extrapolation from the two next frames.
+    The last two frames are returned unchanged.
+
+    :param clip:            Clip to process.
+    :param planes:          Planes to process.
+    :param backend:         Force a specific implementation.
+                            Defaults to zsmooth > rgvs > akarin.
+
+    :return:                Processed clip.
+    """
+    assert check_variable(clip, forward_clense)
+
+    backend = _cleaner_backend(clip, backend, forward_clense)
+
+    if backend is Backend.ZSMOOTH:
+        return clip.zsmooth.ForwardClense(planes=planes)
+
+    if backend is Backend.RGVS:
+        return pick_func_stype(clip, core.lazy.rgvs.ForwardClense, core.lazy.rgsf.ForwardClense)(clip, planes)
+
+    return norm_expr(
+        [clip, shift_clip(clip, 1), shift_clip(clip, 2)],
+        aka_forward_clense_expr(clip.num_frames), planes, force_akarin=forward_clense
+    )
+
+
+def backward_clense(clip: vs.VideoNode, planes: PlanesT = None, backend: Backend | str | None = None) -> vs.VideoNode:
+    """
+    Clamp each frame to the median of the previous frame and its extrapolation from the two previous frames.
+    The first two frames are returned unchanged.
+
+    :param clip:            Clip to process.
+    :param planes:          Planes to process.
+    :param backend:         Force a specific implementation.
+                            Defaults to zsmooth > rgvs > akarin.
 
+    :return:                Processed clip.
+    """
+    assert check_variable(clip, backward_clense)
+
+    backend = _cleaner_backend(clip, backend, backward_clense)
+
+    if backend is Backend.ZSMOOTH:
+        return clip.zsmooth.BackwardClense(planes=planes)
+
+    if backend is Backend.RGVS:
+        return pick_func_stype(clip, core.lazy.rgvs.BackwardClense, core.lazy.rgsf.BackwardClense)(clip, planes)
+
+    return norm_expr(
+        [clip, shift_clip(clip, -1), shift_clip(clip, -2)],
+        aka_backward_clense_expr(), planes, force_akarin=backward_clense
+    )
+
+
+def vertical_cleaner(
+    clip: vs.VideoNode, mode: VerticalCleanerModeT = VerticalCleanerMode.MEDIAN, backend: Backend | str | None = None
+) -> vs.VideoNode:
+    """
+    :param clip:            Clip to process.
+    :param mode:            VerticalCleaner mode(s) for each plane.
+    :param backend:         Force a specific implementation.
+                            Defaults to zsmooth > rgvs > akarin.
+
+    :return:                Processed clip.
+    """
+    assert check_variable(clip, vertical_cleaner)
+
+    mode = normalize_seq(mode, clip.format.num_planes)
+
+    if not sum(mode):
+        return clip
 
-def forward_clense(clip: vs.VideoNode, planes: PlanesT = None) -> vs.VideoNode:
-    return pick_func_stype(clip, core.lazy.rgvs.ForwardClense, core.lazy.rgsf.ForwardClense)(clip, planes)
+    backend = _cleaner_backend(clip, backend, vertical_cleaner)
 
+    if backend is Backend.ZSMOOTH:
+        return clip.zsmooth.VerticalCleaner(mode)
 
-def backward_clense(clip: vs.VideoNode, planes: PlanesT = None) -> vs.VideoNode:
-    return pick_func_stype(clip, core.lazy.rgvs.BackwardClense, core.lazy.rgsf.BackwardClense)(clip, planes)
+    if backend is Backend.RGVS:
+        return pick_func_stype(clip, core.lazy.rgvs.VerticalCleaner, core.lazy.rgsf.VerticalCleaner)(clip, mode)
 
+    expr = [
+        '' if not m else aka_vertical_cleaner_expr_1() if m == VerticalCleanerMode.MEDIAN
+        else aka_vertical_cleaner_expr_2()
+        for m in mode
+    ]
 
-def vertical_cleaner(clip: vs.VideoNode, mode: VerticalCleanerModeT = VerticalCleanerMode.MEDIAN) -> vs.VideoNode:
-    return pick_func_stype(clip, core.lazy.rgvs.VerticalCleaner, core.lazy.rgsf.VerticalCleaner)(clip, mode)
+    return expr_func(clip, expr, force_akarin=vertical_cleaner)
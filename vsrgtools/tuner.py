@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+
+from functools import partial
+from importlib.util import find_spec
+from time import perf_counter
+from typing import Any, Callable, Iterable, Sequence
+
+from vstools import (
+    ConvMode, CustomError, CustomStrEnum, CustomValueError, FuncExceptT, SPath, SPathLike, core, get_user_data_dir, vs
+)
+
+__all__ = [
+    'Backend',
+    'BackendTuner', 'backend_tuner'
+]
+
+
+class Backend(CustomStrEnum):
+    """Implementations the RemoveGrain, Repair and box blur dispatchers can pick from."""
+
+    ZSMOOTH = 'zsmooth'
+    """zsmooth plugin."""
+
+    RGVS = 'rgvs'
+    """RGVS plugin, RGSF for float clips."""
+
+    AKARIN = 'akarin'
+    """Akarin expressions."""
+
+    VSZIP = 'vszip'
+    """vszip plugin."""
+
+    STD = 'std'
+    """VapourSynth core filters."""
+
+    MATRIX = 'matrix'
+    """BlurMatrix convolutions."""
+
+    NUMPY = 'numpy'
+    """NumPy reference engine, see `vsrgtools.rgnumpy`."""
+
+    @classmethod
+    def from_param(cls, value: Any, func_except: FuncExceptT | None = None) -> Backend | None:
+        """Get the requested backend, raising if it can't be used in the current environment."""
+
+        backend = super().from_param(value, func_except)
+
+        if backend is not None and not backend.is_available:
+            raise CustomValueError('The requested backend is not available!', func_except or cls.from_param, backend)
+
+        return backend
+
+    @property
+    def is_available(self) -> bool:
+        if self is Backend.MATRIX:
+            return True
+
+        if self is Backend.NUMPY:
+            return find_spec('numpy') is not None
+
+        return hasattr(core, self.value)
+
+
+_box_blur_radii = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64)
+_plugin_namespaces = ('zsmooth', 'rgvs', 'rgsf', 'akarin', 'vszip')
+
+
+class BackendTuner:
+    """
+    Micro-benchmarks the available backends of the RemoveGrain, Repair and box blur dispatchers
+    and persists the fastest one per mode, format and resolution to a JSON cache.
+
+    Results are stored per host, keyed by CPU, core version and plugin versions,
+    and only consulted by the dispatchers once the tuner is enabled.
+    """
+
+    candidates = {
+        'removegrain': (Backend.ZSMOOTH, Backend.RGVS, Backend.AKARIN),
+        'repair': (Backend.ZSMOOTH, Backend.RGVS, Backend.AKARIN),
+        'box_blur': (Backend.VSZIP, Backend.STD, Backend.MATRIX),
+    }
+
+    def __init__(self, path: SPathLike | None = None) -> None:
+        self.path = SPath(path) if path is not None else SPath(get_user_data_dir()) / 'vsrgtools' / 'backends.json'
+        self.enabled = False
+        self._table: dict[str, str] | None = None
+
+    def enable(self, path: SPathLike | None = None) -> None:
+        """Make the dispatchers consult the cached results, optionally loading them from another path."""
+
+        if path is not None:
+            self.path = SPath(path)
+
+        self._table = None
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    @staticmethod
+    def host_key() -> str:
+        """Key of the current host, from CPU, core version and plugin versions."""
+
+        plugins = sorted(
+            f'{p.namespace}={getattr(p, "plugin_version", getattr(p, "version", ""))}'
+            for p in core.plugins() if p.namespace in _plugin_namespaces
+        )
+
+        return '|'.join([
+            platform.machine(), platform.processor() or 'unknown', str(os.cpu_count()),
+            f'R{core.version_number()}', *plugins
+        ])
+
+    @staticmethod
+    def entry_key(func: str, mode: Any, clip: vs.VideoNode) -> str | None:
+        """Key of a dispatch decision, or None if the request can't be matched to a single benchmark."""
+
+        assert clip.format
+
+        if isinstance(mode, Sequence) and not isinstance(mode, str):
+            modes = {m for m in mode if m}
+
+            if len(modes) != 1:
+                return None
+
+            mode = modes.pop()
+
+        if isinstance(mode, int):
+            mode = int(mode)
+
+        area = clip.width * clip.height
+
+        res = 'sd' if area <= 720 * 576 else 'hd' if area <= 1920 * 1080 else 'uhd'
+
+        fmt = f"{'f' if clip.format.sample_type == vs.FLOAT else 'i'}{clip.format.bits_per_sample}"
+
+        return f'{func}:{mode}:{fmt}:{res}'
+
+    @staticmethod
+    def box_blur_mode(mode: ConvMode, radius: int) -> str:
+        """Benchmark key of a box blur, with the radius snapped to the tuned radii."""
+
+        return f'{mode.value}{max([r for r in _box_blur_radii if r <= radius], default=1)}'
+
+    def load(self) -> dict[str, str]:
+        if self._table is None:
+            try:
+                self._table = json.loads(self.path.read_text()).get(self.host_key(), {})
+            except (OSError, ValueError):
+                self._table = {}
+
+        return self._table
+
+    def save(self, results: dict[str, str]) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+
+        data[self.host_key()] = data.get(self.host_key(), {}) | results
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(data, indent=4, sort_keys=True))
+
+        self._table = data[self.host_key()]
+
+    def get(self, func: Callable[..., Any] | str, mode: Any, clip: vs.VideoNode) -> Backend | None:
+        """Get the cached fastest backend for this call, if the tuner is enabled and has one."""
+
+        if not self.enabled:
+            return None
+
+        if (key := self.entry_key(func if isinstance(func, str) else func.__name__, mode, clip)) is None:
+            return None
+
+        if (backend := self.load().get(key)) is None:
+            return None
+
+        if not (backend := Backend(backend)).is_available:
+            return None
+
+        return backend
+
+    def tune(
+        self,
+        funcs: Iterable[str] = ('removegrain', 'repair', 'box_blur'),
+        formats: Iterable[int] = (vs.GRAY8, vs.GRAY10, vs.GRAY16, vs.GRAYH, vs.GRAYS),
+        resolutions: Iterable[tuple[int, int]] = ((1920, 1080), ),
+        rg_modes: Iterable[int] = (*range(1, 13), *range(17, 25), 26, 27, 28),
+        rp_modes: Iterable[int] = (*range(1, 25), 26, 27, 28),
+        radii: Iterable[int] = _box_blur_radii,
+        frames: int = 32, save: bool = True
+    ) -> dict[str, str]:
+        """
+        Benchmark every available backend on BlankClip sources and keep the fastest one.
+
+        :param funcs:           Dispatchers to tune.
+        :param formats:         Formats to benchmark.
+        :param resolutions:     Resolutions to benchmark, one per sd/hd/uhd bucket is enough.
+        :param rg_modes:        RemoveGrain modes to benchmark.
+        :param rp_modes:        Repair modes to benchmark.
+        :param radii:           Box blur radii to benchmark.
+        :param frames:          Number of frames rendered per benchmark.
+        :param save:            Persist the results to the cache file and enable the tuner.
+
+        :return:                Mapping of dispatch keys to the picked backend.
+        """
+        from .blur import box_blur
+        from .rgtools import removegrain, repair
+
+        runners: dict[
+            str, tuple[Iterable[Any], Callable[[Any], Any], Callable[[vs.VideoNode, Any, Backend], vs.VideoNode]]
+        ] = {
+            'removegrain': (rg_modes, int, lambda clip, m, b: removegrain(clip, m, backend=b)),
+            'repair': (rp_modes, int, lambda clip, m, b: repair(clip, clip.std.Invert(), m, backend=b)),
+            'box_blur': (
+                radii, partial(self.box_blur_mode, ConvMode.HV), lambda clip, r, b: box_blur(clip, r, backend=b)
+            ),
+        }
+
+        results = dict[str, str]()
+
+        for func in funcs:
+            if func not in runners:
+                raise CustomValueError('Unknown function to tune!', self.tune, func)
+
+            modes, mode_key, runner = runners[func]
+            backends = [b for b in self.candidates[func] if b.is_available]
+
+            for fmt in formats:
+                for width, height in resolutions:
+                    clip = core.std.BlankClip(None, width, height, fmt, frames, keep=False)
+
+                    for mode in modes:
+                        timings = dict[Backend, float]()
+
+                        for backend in backends:
+                            try:
+                                timings[backend] = self._benchmark(runner(clip, mode, backend))
+                            except (vs.Error, CustomError, AttributeError):
+                                continue
+
+                        if timings and (key := self.entry_key(func, mode_key(mode), clip)):
+                            results[key] = min(timings, key=timings.__getitem__).value
+
+        if save:
+            self.save(results)
+            self.enable()
+
+        return results
+
+    @staticmethod
+    def _benchmark(clip: vs.VideoNode) -> float:
+        # warm up the filter graph before timing
+        clip.get_frame(0).close()
+
+        start = perf_counter()
+
+        for frame in clip.frames(close=True):
+            ...
+
+        return perf_counter() - start
+
+
+backend_tuner = BackendTuner()